@@ -0,0 +1,34 @@
+"""Benchmark ``webhelpers.html.builder`` tag generation.
+
+Usage: python benchmarks/bench_builder.py [NUMBER]
+"""
+import os
+import sys
+import timeit
+
+# Run from a checkout without installing WebHelpers.
+sys.path.insert(0,
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+SETUP = """\
+from webhelpers.html.builder import HTML, make_tag
+td = HTML.compile("td", "class_", "title", align="left")
+"""
+
+TESTS = [
+    ("make_tag", 'make_tag("td", "Foo & Bar", class_="odd", title="x", '
+        'align="left")'),
+    ("HTML.td", 'HTML.td("Foo & Bar", class_="odd", title="x", '
+        'align="left")'),
+    ("HTML.compile", 'td("Foo & Bar", class_="odd", title="x")'),
+    ]
+
+def main():
+    number = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    for label, stmt in TESTS:
+        timer = timeit.Timer(stmt, SETUP)
+        best = min(timer.repeat(3, number))
+        print "%-14s %8.3f usec/call" % (label, best * 1e6 / number)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""Benchmark rendering ``webhelpers.html.grid.Grid``.
+
+Renders a grid of ROWS rows (default 10000) by 20 columns, as dicts with
+the default cell format, as objects with ``ObjectGrid``, and with a numbered
+column and a custom column format.  Then renders the dicts with
+``render_parallel()`` in PROCESSES processes (default: one per CPU).
+
+Finally renders 10 times as many rows from columns of data: with
+``ColumnarGrid``, and by building a dict per row for ``Grid``, with
+``format_number()`` for the numbers as ``ColumnarGrid`` does.
+
+Usage: python benchmarks/bench_grid.py [ROWS [PROCESSES]]
+"""
+import array
+import os
+import sys
+import time
+
+# Run from a checkout without installing WebHelpers.
+sys.path.insert(0,
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from webhelpers.html import HTML
+from webhelpers.html import grid
+from webhelpers.number import format_number
+
+COLUMNS = ["col%d" % i for i in range(20)]
+
+class Record(object):
+    def __init__(self, values):
+        self.__dict__.update(values)
+
+def bold_format(column_number, i, record):
+    return HTML.td(HTML.b(record["col0"]), class_="c%s" % column_number)
+
+def best_time(func):
+    best = None
+    for i in range(3):
+        start = time.time()
+        func()
+        elapsed = time.time() - start
+        if best is None or elapsed < best:
+            best = elapsed
+    return best
+
+def main():
+    rows = 10000
+    if len(sys.argv) > 1:
+        rows = int(sys.argv[1])
+    processes = None
+    if len(sys.argv) > 2:
+        processes = int(sys.argv[2])
+    dicts = []
+    for i in xrange(rows):
+        dicts.append(dict([(c, "<%s %d>" % (c, i)) for c in COLUMNS]))
+    objects = [Record(d) for d in dicts]
+
+    def plain():
+        grid.Grid(dicts, COLUMNS).__html__()
+
+    def objectgrid():
+        grid.ObjectGrid(objects, COLUMNS).__html__()
+
+    def formatted():
+        g = grid.Grid(dicts, ["_numbered"] + COLUMNS[1:])
+        g.column_formats["col1"] = bold_format
+        g.__html__()
+
+    def parallel():
+        grid.Grid(dicts, COLUMNS).render_parallel(processes)
+
+    tests = [
+        ("Grid", plain),
+        ("ObjectGrid", objectgrid),
+        ("Grid, numbered+format", formatted),
+        ("Grid.render_parallel", parallel),
+        ]
+    cells = rows * len(COLUMNS)
+    for label, func in tests:
+        elapsed = best_time(func)
+        print "%-22s %8.1f msec %8.2f usec/cell" % (label, elapsed * 1e3,
+            elapsed * 1e6 / cells)
+
+    rows *= 10
+    columns = {}
+    for i, name in enumerate(COLUMNS):
+        if i % 2:
+            columns[name] = array.array("d", [j * 1.5 for j in xrange(rows)])
+        else:
+            columns[name] = array.array("l", xrange(i, rows + i))
+    dicts = objects = None
+
+    def columnar():
+        grid.ColumnarGrid(columns, COLUMNS).__html__()
+
+    def row_dicts():
+        records = []
+        for j in xrange(rows):
+            records.append(dict([(name, format_number(values[j]))
+                                 for name, values in columns.iteritems()]))
+        grid.Grid(records, COLUMNS).__html__()
+
+    tests = [
+        ("ColumnarGrid", columnar),
+        ("Grid, dict per row", row_dicts),
+        ]
+    cells = rows * len(COLUMNS)
+    for label, func in tests:
+        elapsed = best_time(func)
+        print "%-22s %8.1f msec %8.2f usec/cell" % (label, elapsed * 1e3,
+            elapsed * 1e6 / cells)
+
+if __name__ == "__main__":
+    main()
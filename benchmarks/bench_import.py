@@ -0,0 +1,64 @@
+"""Report the cold import time of each WebHelpers module.
+
+Each module is imported in a fresh interpreter so that earlier imports don't
+hide its cost.  The time includes all modules it imports in turn; the last
+column shows how many of those belong to WebHelpers.
+
+Usage: python benchmarks/bench_import.py [MODULE ...]
+"""
+import os
+import subprocess
+import sys
+
+MODULES = [
+    "webhelpers.html",
+    "webhelpers.html.tags",
+    "webhelpers.html.tools",
+    "webhelpers.html.converters",
+    "webhelpers.html.grid",
+    "webhelpers.paginate",
+    "webhelpers.text",
+    "webhelpers.number",
+    "webhelpers.date",
+    "webhelpers.constants",
+    "webhelpers.containers",
+    "webhelpers.feedgenerator",
+    "webhelpers.markdown",
+    "webhelpers.textile",
+    ]
+
+SCRIPT = """\
+import sys, time
+start = time.time()
+import %s
+elapsed = time.time() - start
+count = len([x for x in sys.modules if x.startswith("webhelpers")])
+print elapsed, count
+"""
+
+def time_import(module, repeat=5):
+    """Return the best import time in seconds and the webhelpers module count.
+    """
+    env = os.environ.copy()
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, 
+        [root, env.get("PYTHONPATH")]))
+    best = None
+    for i in range(repeat):
+        proc = subprocess.Popen([sys.executable, "-c", SCRIPT % module],
+            stdout=subprocess.PIPE, env=env)
+        output = proc.communicate()[0]
+        elapsed, count = output.split()
+        elapsed = float(elapsed)
+        if best is None or elapsed < best:
+            best = elapsed
+    return best, int(count)
+
+def main():
+    modules = sys.argv[1:] or MODULES
+    for module in modules:
+        elapsed, count = time_import(module)
+        print "%-30s %8.2f msec %4d modules" % (module, elapsed * 1000, count)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+"""Benchmark ``webhelpers.paginate.Page.pager()``.
+
+Renders the pager of each of PAGES pages (default 10000) with several
+formats.
+
+Usage: python benchmarks/bench_paginate.py [PAGES]
+"""
+import os
+import sys
+import time
+
+# Run from a checkout without installing WebHelpers.
+sys.path.insert(0,
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from webhelpers import paginate
+
+FORMATS = [
+    "~2~",
+    "$link_first $link_previous ~4~ $link_next $link_last",
+    "Page $page of $page_count",
+    ]
+
+def main():
+    pages = 10000
+    if len(sys.argv) > 1:
+        pages = int(sys.argv[1])
+    items_per_page = 20
+    collection = range(pages * items_per_page)
+    page_url = paginate.PageURL("/articles", {"q": "shoes", "sort": "price"})
+    for format in FORMATS:
+        best = None
+        for i in range(3):
+            start = time.time()
+            for number in xrange(1, pages + 1):
+                page = paginate.Page(collection, number, items_per_page,
+                    url=page_url)
+                page.pager(format)
+            elapsed = time.time() - start
+            if best is None or elapsed < best:
+                best = elapsed
+        print "%-54s %6.1f usec/page" % (repr(format), best * 1e6 / pages)
+
+if __name__ == "__main__":
+    main()
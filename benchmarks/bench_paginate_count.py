@@ -0,0 +1,106 @@
+"""Benchmark counting an SQLAlchemy select for ``webhelpers.paginate.Page``.
+
+Compares the old way of counting (executing the whole select and reading
+the cursor's rowcount) with ``SELECT count(*) FROM (<select>)``, and with
+counting in the page query by ``count(*) OVER ()`` (``WindowCount``).
+
+The database is a temporary SQLite file with ROWS rows (default 1000000).
+SQLite doesn't scan the table for rowcount, but rowcount is -1, which is
+why it can't be used.  SQLite's window functions materialize all the rows,
+so ``WindowCount`` is slower there than two queries; it's for client/server
+databases where the round trip costs more.
+
+Usage: python benchmarks/bench_paginate_count.py [ROWS [NUMBER]]
+"""
+import os
+import sys
+import tempfile
+import time
+
+# Run from a checkout without installing WebHelpers.
+sys.path.insert(0,
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import sqlalchemy as sa
+import sqlalchemy.orm as orm
+
+from webhelpers import paginate
+
+def create_database(path, rows):
+    engine = sa.create_engine("sqlite:///" + path)
+    metadata = sa.MetaData()
+    notes = sa.Table("notes", metadata,
+        sa.Column("id", sa.Integer, primary_key=True),
+        sa.Column("title", sa.String(40)))
+    metadata.create_all(engine)
+    conn = engine.connect()
+    chunk = 50000
+    for start in xrange(0, rows, chunk):
+        stop = min(start + chunk, rows)
+        records = [{"id": i, "title": "Note %d" % i}
+            for i in xrange(start + 1, stop + 1)]
+        conn.execute(notes.insert(), records)
+    conn.close()
+    return engine, notes
+
+def best_time(func, number):
+    best = None
+    for i in range(3):
+        start = time.time()
+        for j in xrange(number):
+            func()
+        elapsed = (time.time() - start) / number
+        if best is None or elapsed < best:
+            best = elapsed
+    return best
+
+def main():
+    rows = 1000000
+    number = 5
+    if len(sys.argv) > 1:
+        rows = int(sys.argv[1])
+    if len(sys.argv) > 2:
+        number = int(sys.argv[2])
+    fd, path = tempfile.mkstemp(suffix=".db")
+    os.close(fd)
+    try:
+        print "Creating %d rows..." % rows
+        engine, notes = create_database(path, rows)
+        session = orm.sessionmaker(bind=engine)()
+        sql = notes.select().order_by(notes.c.id)
+        page_number = rows // 40    # Somewhere in the middle
+
+        def rowcount():
+            result = session.execute(sql)
+            result.rowcount
+            result.close()
+
+        result = session.execute(sql)
+        print "rowcount = %d, count(*) = %d" % (result.rowcount,
+            len(paginate.get_wrapper(sql, session)))
+        result.close()
+
+        def count():
+            len(paginate.get_wrapper(sql, session))
+
+        def page_count():
+            paginate.Page(sql, page_number, sqlalchemy_session=session)
+
+        def page_window():
+            paginate.Page(sql, page_number, sqlalchemy_session=session,
+                counter=paginate.WindowCount())
+
+        tests = [
+            ("execute+rowcount", rowcount),
+            ("count(*) subquery", count),
+            ("Page, 2 queries", page_count),
+            ("Page, WindowCount", page_window),
+            ]
+        for label, func in tests:
+            print "%-18s %8.1f msec/call" % (label,
+                best_time(func, number) * 1e3)
+    finally:
+        os.remove(path)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,35 @@
+"""Benchmark ``webhelpers.html.tags.select`` with a country list.
+
+Usage: python benchmarks/bench_select.py [NUMBER]
+"""
+import os
+import sys
+import timeit
+
+# Run from a checkout without installing WebHelpers.
+sys.path.insert(0,
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+SETUP = """\
+from webhelpers.constants import country_codes
+from webhelpers.html.tags import select, Options
+countries = country_codes()
+options = Options(countries)
+"""
+
+TESTS = [
+    ("list", 'select("country", "US", countries)'),
+    ("Options", 'select("country", "US", options)'),
+    ]
+
+def main():
+    number = 1000
+    if len(sys.argv) > 1:
+        number = int(sys.argv[1])
+    for label, stmt in TESTS:
+        timer = timeit.Timer(stmt, SETUP)
+        best = min(timer.repeat(3, number))
+        print "%-14s %8.1f usec/call" % (label, best * 1e6 / number)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,35 @@
+"""Benchmark ``webhelpers.text.urlify``.
+
+Usage: python benchmarks/bench_text.py [NUMBER]
+"""
+import os
+import sys
+import timeit
+
+# Run from a checkout without installing WebHelpers.
+sys.path.insert(0,
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+SETUP = """\
+from webhelpers.text import urlify, urlify_many
+titles = ["The &#8220;Quick&#8221; Brown Fox &amp; the <em>Lazy</em> Dog",
+    "Caf&eacute; Society &mdash; 50&#176; North", "Mighty Mighty Bosstones"]
+titles = titles * 100
+"""
+
+TESTS = [
+    ("urlify", '[urlify(x) for x in titles]'),
+    ("urlify_many", 'list(urlify_many(titles))'),
+    ]
+
+def main():
+    number = 100
+    if len(sys.argv) > 1:
+        number = int(sys.argv[1])
+    for label, stmt in TESTS:
+        timer = timeit.Timer(stmt, SETUP)
+        best = min(timer.repeat(3, number))
+        print "%-14s %8.2f usec/title" % (label, best * 1e6 / number / 300)
+
+if __name__ == "__main__":
+    main()
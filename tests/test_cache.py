@@ -0,0 +1,115 @@
+import os
+import re
+import shutil
+import tempfile
+
+from nose.tools import eq_
+
+from webhelpers import cache
+from webhelpers.cache import *
+from webhelpers.html import literal
+from webhelpers.html.converters import markdown
+from webhelpers.html.tools import auto_link, highlight
+
+calls = []
+
+def shout(text, suffix="!"):
+    calls.append(text)
+    return text.upper() + suffix
+
+def test_make_key():
+    eq_(make_key("f", ("a",), {"x": 1}), make_key("f", ("a",), {"x": 1}))
+    assert make_key("f", ("a",)) != make_key("g", ("a",))
+    assert make_key("f", ("a", "b")) != make_key("f", ("ab",))
+    assert make_key("f", (1,)) != make_key("f", ("1",))
+    assert make_key("f", ("a",)) != make_key("f", (literal("a"),))
+    eq_(make_key("f", (re.compile("a"),)), make_key("f", (re.compile("a"),)))
+    eq_(make_key("f", (os,)), make_key("f", (os,)))
+    eq_(make_key("f", (object(),)), None)
+
+def make_adder(n):
+    def add(x):
+        return x + n
+    return add
+
+def test_make_key_functions():
+    eq_(make_key("f", (make_key,)), make_key("f", (make_key,)))
+    eq_(make_key("f", (make_adder(1),)), None)
+    eq_(make_key("f", (lambda x: x,)), None)
+    def nested(x):
+        return x
+    eq_(make_key("f", (nested,)), None)
+    class Nested(object):
+        pass
+    eq_(make_key("f", (Nested,)), None)
+
+def test_cached_closures():
+    call = cached(MemoryBackend())(apply)
+    eq_(call(make_adder(1), (10,)), 11)
+    eq_(call(make_adder(100), (10,)), 110)
+    eq_(call(lambda x: x * 2, (3,)), 6)
+    eq_(call(lambda x: x * 3, (3,)), 9)
+
+def test_make_key_version():
+    key = make_key("f", ("a",))
+    old = cache._KEY_SALT
+    cache._KEY_SALT = "webhelpers-0.1;"
+    try:
+        assert make_key("f", ("a",)) != key
+    finally:
+        cache._KEY_SALT = old
+
+def test_cached_with_backend():
+    backend = MemoryBackend(10)
+    func = cached(backend)(shout)
+    del calls[:]
+    eq_(func("a"), "A!")
+    eq_(func("a"), "A!")
+    eq_(func("a", suffix="?"), "A?")
+    eq_(calls, ["a", "a"])
+    eq_((backend.hits, backend.misses), (1, 2))
+    eq_(func.__name__, "shout")
+    assert func.uncached is shout
+
+def test_global_backend():
+    func = cached()(shout)
+    del calls[:]
+    func("a"); func("a")
+    eq_(len(calls), 2)
+    backend = MemoryBackend()
+    set_backend(backend)
+    try:
+        assert get_backend() is backend
+        func("a"); func("a")
+        eq_(len(calls), 3)
+        text = "Go to http://example.com/ <b>now</b>"
+        eq_(auto_link(text), auto_link.uncached(text))
+        eq_(auto_link(text), auto_link.uncached(text))
+        eq_(highlight(text, "now"), highlight.uncached(text, "now"))
+        eq_(markdown("*hi*"), markdown.uncached("*hi*"))
+        eq_(backend.hits, 2)
+    finally:
+        set_backend(None)
+
+def test_sqlite_backend():
+    try:
+        import sqlite3
+    except ImportError:
+        from nose.plugins.skip import SkipTest
+        raise SkipTest()
+    tmp = tempfile.mkdtemp()
+    try:
+        path = os.path.join(tmp, "cache.db")
+        backend = SQLiteBackend(path)
+        eq_(backend.get("k"), None)
+        backend.set("k", literal(u"<b>\u1234</b>"))
+        value = SQLiteBackend(path).get("k")
+        eq_(value, literal(u"<b>\u1234</b>"))
+        assert isinstance(value, literal)
+        backend.delete("k")
+        eq_(backend.get("k"), None)
+        backend.set("k", 1)
+        backend.clear()
+        eq_(backend.get("k"), None)
+    finally:
+        shutil.rmtree(tmp)
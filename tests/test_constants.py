@@ -0,0 +1,30 @@
+from nose.tools import eq_
+
+from webhelpers.constants import *
+
+def test_built_once():
+    for func in [country_codes, us_states, us_territories, canada_provinces,
+        uk_counties]:
+        result = func()
+        assert isinstance(result, tuple)
+        assert func() is result
+
+def test_place_index():
+    index = PlaceIndex([("B", "Beta"), ("A", "Alpha"), ("AB", "alphabet")])
+    eq_(index.name("A"), "Alpha")
+    eq_(index.name("Z"), None)
+    eq_(index.code("ALPHA"), "A")
+    eq_(index.code("Gamma", "?"), "?")
+    eq_(index.search("al"), [("A", "Alpha"), ("AB", "alphabet")])
+    eq_(index.search("ALPHAB"), [("AB", "alphabet")])
+    eq_(index.search("al", limit=1), [("A", "Alpha")])
+    eq_(index.search("c"), [])
+    eq_(len(index.search("")), 3)
+
+def test_prebuilt_indexes():
+    assert country_index() is country_index()
+    eq_(country_index().code("united kingdom"), "GB")
+    eq_(us_state_index().name("OR"), "Oregon")
+    eq_(canada_province_index().code("Yukon"), "YT")
+    eq_(us_territory_index().name("GU"), "Guam")
+    eq_(uk_county_index().search("kent"), [("Kent", "Kent")])
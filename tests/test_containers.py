@@ -9,7 +9,7 @@ from util import raises
 
 from webhelpers.containers import DumbObject
 from webhelpers.containers import defaultdict as webhelpers_containers_defaultdict
-from webhelpers.containers import distribute, get_many
+from webhelpers.containers import distribute, get_many, LRUCache
 
 # Tests from Python 2.5 test_defaultdict_defaultdict.py, as this is just a 2.4 backport
 # anyway
@@ -169,3 +169,27 @@ def test_get_many():
 
     raises(KeyError, get_many, params, required=[1, 6])
     raises(KeyError, get_many, params, one_of=[7, 6])
+
+def test_lru_cache():
+    cache = LRUCache(3)
+    for key in "abc":
+        cache[key] = key.upper()
+    eq_(cache.keys(), ["a", "b", "c"])
+    eq_(cache["a"], "A")
+    eq_(cache.keys(), ["b", "c", "a"])
+    cache["d"] = "D"
+    eq_(cache.keys(), ["c", "a", "d"])
+    assert "b" not in cache
+    eq_(cache.get("b"), None)
+    eq_(cache.get("b", 0), 0)
+    raises(KeyError, lambda: cache["b"])
+    cache["c"] = "CC"
+    eq_(cache.keys(), ["a", "d", "c"])
+    eq_(cache.get("c"), "CC")
+    del cache["d"]
+    eq_(cache.keys(), ["a", "c"])
+    eq_(len(cache), 2)
+    cache.clear()
+    eq_(len(cache), 0)
+    eq_(cache.keys(), [])
+    raises(ValueError, LRUCache, 0)
@@ -0,0 +1,248 @@
+"""Test webhelpers.html.grid."""
+import array
+import pickle
+import urllib
+
+from nose.tools import eq_, assert_raises
+
+from webhelpers.html import HTML, literal
+from webhelpers.html.grid import Grid, ObjectGrid, ListGrid, ColumnarGrid
+
+ITEMS = [
+    {"name": "Apple", "price": 3},
+    {"name": "Bread & Butter", "price": 5},
+    {"name": "Cheese", "price": 12},
+    ]
+
+HEADER = '<tr class="header"><td class="c1 ordering numbered">#<span class="marker"></span></td><td class="c2 name">Name</td><td class="c3 price">Price</td></tr>'
+
+ROWS = [
+    '<tr class="odd r1"><td class="c1">1</td><td class="c2">Apple</td><td class="c3">3</td></tr>',
+    '<tr class="even r2"><td class="c1">2</td><td class="c2">Bread &amp; Butter</td><td class="c3">5</td></tr>',
+    '<tr class="odd r3"><td class="c1">3</td><td class="c2">Cheese</td><td class="c3">12</td></tr>',
+    ]
+
+class Item(object):
+    def __init__(self, name, price):
+        self.name = name
+        self.price = price
+
+def test_grid():
+    grid = Grid(ITEMS, ["_numbered", "name", "price"])
+    html = grid.__html__()
+    assert isinstance(html, literal)
+    eq_(html, HEADER + "".join(ROWS))
+
+def test_object_grid():
+    items = [Item(x["name"], x["price"]) for x in ITEMS]
+    grid = ObjectGrid(items, ["_numbered", "name", "price"])
+    eq_(grid.__html__(), HEADER + "".join(ROWS))
+
+def test_list_grid():
+    items = [(x["name"], x["price"]) for x in ITEMS]
+    grid = ListGrid(items, column_labels=["Name", "Price"])
+    eq_(grid.__html__(), '<tr class="header"><td class="c1 0">Name</td><td class="c2 1">Price</td></tr><tr class="odd r1"><td class="c1">Apple</td><td class="c2">3</td></tr><tr class="even r2"><td class="c1">Bread &amp; Butter</td><td class="c2">5</td></tr><tr class="odd r3"><td class="c1">Cheese</td><td class="c2">12</td></tr>')
+
+def test_iter_html():
+    read = []
+    def items():
+        for item in ITEMS:
+            read.append(item)
+            yield item
+    grid = Grid(items(), ["_numbered", "name", "price"])
+    rows = grid.iter_html()
+    eq_(rows.next(), HEADER)
+    eq_(read, [])
+    eq_(rows.next(), ROWS[0])
+    eq_(len(read), 1)
+    eq_(list(rows), ROWS[1:])
+
+def test_prepare_columns():
+    grid = Grid(ITEMS, ["_numbered", "name", "price"])
+    cells = grid.prepare_columns()
+    eq_(len(cells), 3)
+    eq_([cell(1, ITEMS[1]) for cell in cells],
+        ['<td class="c1">2</td>', '<td class="c2">Bread &amp; Butter</td>',
+         '<td class="c3">5</td>'])
+
+def test_descending_numbers():
+    grid = Grid(ITEMS, ["_numbered", "name"], start_number=10,
+        order_column="_numbered", order_direction="dsc")
+    number_cell = grid.prepare_columns()[0]
+    numbers = [number_cell(i, x) for i, x in enumerate(ITEMS)]
+    eq_(numbers, ['<td class="c1">10</td>', '<td class="c1">9</td>',
+                  '<td class="c1">8</td>'])
+
+def test_custom_formats():
+    def price_format(column_number, i, record):
+        return "<%s>" % record["price"]    # Not a literal, so it's escaped
+    class TaxGrid(Grid):
+        def calc_row_no(self, i, column):
+            return i * 10
+        def default_column_format(self, column_number, i, record, column_name):
+            return literal("<td>%s</td>" % record[column_name].upper())
+    grid = TaxGrid(ITEMS[:1], ["_numbered", "name", "price"])
+    grid.column_formats["price"] = price_format
+    eq_(grid.__html__().split("</tr>")[1],
+        '<tr class="odd r1"><td class="c1">0</td><td>APPLE</td>&lt;3&gt;')
+
+def test_render_parallel():
+    items = [Item("Item <%d>" % i, i) for i in range(25)]
+    grid = ObjectGrid(items, ["_numbered", "name", "price"], start_number=11,
+        order_column="_numbered", order_direction="dsc")
+    html = grid.render_parallel(processes=2, chunksize=4)
+    assert isinstance(html, literal)
+    eq_(html, grid.__html__())
+    # Numbers and odd/even classes continue across chunks.
+    assert '<tr class="odd r5"><td class="c1">7</td>' in html
+
+def test_pickle():
+    grid = Grid(ITEMS, ["_numbered", "name", "price"])
+    copy = pickle.loads(pickle.dumps(grid, 2))
+    eq_(copy.column_formats["_numbered"].im_self, copy)
+    eq_(copy.__html__(), HEADER + "".join(ROWS))
+
+def test_columnar_grid():
+    data = {
+        "name": [x["name"] for x in ITEMS],
+        "price": array.array("i", [x["price"] for x in ITEMS]),
+        }
+    grid = ColumnarGrid(data, ["_numbered", "name", "price"])
+    eq_(grid.number_columns, ["price"])
+    eq_(grid.__html__(), HEADER + "".join(ROWS))
+    grid.blocksize = 2
+    eq_(grid.__html__(), HEADER + "".join(ROWS))
+
+def test_columnar_grid_numbers():
+    data = {"n": array.array("d", [1234567.5, 2.25]), "m": [1000, 2000000]}
+    grid = ColumnarGrid(data, ["n", "m"], number_columns=["n", "m"],
+        thousands=".", decimal=",")
+    eq_(grid.__html__().split("</tr>", 1)[1],
+        '<tr class="odd r1"><td class="c1">1.234.567,5</td><td class="c2">1.000</td></tr>'
+        '<tr class="even r2"><td class="c1">2,25</td><td class="c2">2.000.000</td></tr>')
+    grid = ColumnarGrid(data, ["m"], number_columns=["m"], thousands="&")
+    assert '<td class="c1">1&amp;000</td>' in grid.__html__()
+    grid = ColumnarGrid(data, ["n", "m"], number_columns=[])
+    assert '<td class="c1">1234567.5</td><td class="c2">1000</td>' in grid.__html__()
+
+def test_columnar_grid_formats():
+    def name_format(column_number, i, record):
+        return HTML.td(HTML.b(record["name"]), " ", i)
+    data = {"name": [x["name"] for x in ITEMS]}
+    grid = ColumnarGrid(data, ["_numbered", "name"], start_number=3,
+        order_column="name", order_direction="dsc")
+    grid.column_formats["name"] = name_format
+    grid.blocksize = 2
+    rows = grid.__html__().split("</tr>")[1:-1]
+    eq_(rows[2], '<tr class="odd r3"><td class="c1">5</td><td><b>Cheese</b> 1</td>')
+
+def test_columnar_grid_lengths():
+    assert_raises(ValueError, ColumnarGrid, {"a": [1], "b": [1, 2]}, ["a"])
+
+def test_columnar_grid_parallel():
+    data = {"n": array.array("i", range(0, 25000, 1000)),
+            "s": ["<%d>" % i for i in range(25)]}
+    grid = ColumnarGrid(data, ["_numbered", "n", "s"])
+    eq_(grid.render_parallel(processes=2, chunksize=4), grid.__html__())
+
+def make_url_generator(calls):
+    def url(**params):
+        calls.append(params)
+        return "/items?" + urllib.urlencode(sorted(params.items()))
+    return url
+
+class LinkedGrid(Grid):
+    def generate_header_link(self, column_number, column, label_text):
+        if column == self.order_column and self.order_dir == "asc":
+            new_order_dir = "dsc"
+        else:
+            new_order_dir = "asc"
+        url = self.header_url(column, new_order_dir, self.url_generator,
+            self.additional_kw)
+        label_text = HTML.tag("a", href=url, c=label_text)
+        return Grid.generate_header_link(self, column_number, column,
+            label_text)
+
+def test_header_without_links():
+    grid = Grid(ITEMS, ["name", "price"], order_column="price",
+        order_direction="asc", url=make_url_generator([]))
+    grid.exclude_ordering = []
+    eq_(grid.make_headers(), '<td class="c1 ordering name">Name<span class="marker"></span></td>'
+        '<td class="c2 ordering asc price">Price<span class="marker"></span></td>')
+
+def test_header_links():
+    calls = []
+    grid = LinkedGrid(ITEMS, ["_numbered", "name", "price", "in stock"],
+        order_column="price", order_direction="asc",
+        url=make_url_generator(calls), q="a&b")
+    grid.exclude_ordering = ["_numbered"]
+    headers = grid.make_headers()
+    eq_(headers, '<td class="c1 ordering numbered">#<span class="marker"></span></td>'
+        '<td class="c2 ordering name"><a href="/items?order_col=name&amp;order_dir=asc&amp;q=a%26b">Name</a><span class="marker"></span></td>'
+        '<td class="c3 ordering asc price"><a href="/items?order_col=price&amp;order_dir=dsc&amp;q=a%26b">Price</a><span class="marker"></span></td>'
+        '<td class="c4 ordering in stock"><a href="/items?order_col=in+stock&amp;order_dir=asc&amp;q=a%26b">In Stock</a><span class="marker"></span></td>')
+    # The template and its check, and the column needing quoting.
+    eq_(len(calls), 3)
+    grid.make_headers()
+    eq_(len(calls), 4)
+
+def test_sort_itemlist_changed_records():
+    items = [{"n": 2}, {"n": 1}]
+    grid = Grid(items, ["n"])
+    grid.sort_itemlist("n", "asc")
+    eq_([x["n"] for x in grid.itemlist], [1, 2])
+    items[0]["n"] = 0
+    grid.itemlist = list(grid.itemlist)
+    grid.sort_itemlist("n", "asc")
+    eq_([x["n"] for x in grid.itemlist], [0, 1])
+
+def test_header_links_untemplated():
+    def url(order_col, order_dir):
+        if order_col not in ("name", "price"):
+            raise KeyError(order_col)
+        return "/items/%s/%s" % (order_col, order_dir)
+    grid = Grid(ITEMS, ["name", "price"], url=url)
+    grid.exclude_ordering = []
+    eq_(grid.header_url("name", "asc", url, {}), "/items/name/asc")
+    eq_(grid.header_url("price", "dsc", url, {}), "/items/price/dsc")
+
+def test_sort_itemlist():
+    items = [Item(x["name"], x["price"]) for x in ITEMS]
+    items.append(Item("Apple", 3))
+    gets = []
+    class CountingGrid(ObjectGrid):
+        def column_getter(self, column_name):
+            getter = ObjectGrid.column_getter(self, column_name)
+            def get(record):
+                gets.append(column_name)
+                return getter(record)
+            return get
+    grid = CountingGrid(items, ["name", "price"], order_column="price",
+        order_direction="dsc")
+    grid.sort_itemlist()
+    eq_([x.price for x in grid.itemlist], [12, 5, 3, 3])
+    assert grid.itemlist[2] is items[0]    # Stable
+    eq_(grid.itemlist is items, False)
+    grid.sort_itemlist("name", "asc")
+    eq_([x.name for x in grid.itemlist],
+        ["Apple", "Apple", "Bread & Butter", "Cheese"])
+    grid.sort_itemlist("price", "asc")
+    eq_([x.price for x in grid.itemlist], [3, 3, 5, 12])
+    # Each value was got once.
+    eq_(len(gets), 8)
+
+def test_sort_items():
+    grid = Grid(list(reversed(ITEMS)), ["_numbered", "name", "price"],
+        order_column="name", order_direction="asc")
+    grid.sort_items = True
+    eq_(grid.__html__().split("</tr>", 1)[1], "".join(ROWS))
+
+def test_columnar_grid_sort():
+    data = {"name": [x["name"] for x in ITEMS],
+            "price": array.array("i", [x["price"] for x in ITEMS])}
+    grid = ColumnarGrid(data, ["name", "price"], order_column="price",
+        order_direction="dsc")
+    grid.sort_itemlist()
+    eq_(grid.itemlist.data["price"], array.array("i", [12, 5, 3]))
+    eq_(grid.itemlist.data["name"], ["Cheese", "Bread & Butter", "Apple"])
+    eq_(data["price"], array.array("i", [3, 5, 12]))
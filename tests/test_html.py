@@ -1,6 +1,7 @@
 from nose.tools import eq_
 
 from webhelpers.html import literal, lit_sub, escape, HTML
+from webhelpers.html.builder import FrozenAttrs
 
 def test_double_escape():
     quoted = escape(u'This string is "quoted"')
@@ -83,3 +84,77 @@ def test_newline_arg():
     eq_(HTML.a(_closed=False, _nl=True), literal(u'<a>\n'))
     eq_(HTML.a("A", "B", href="/"),      literal(u'<a href="/">AB</a>'))
     eq_(HTML.a("A", "B", href="/", _nl=True), literal(u'<a href="/">\nA\nB\n</a>\n'))
+
+def test_compiled_tag():
+    td = HTML.compile("td", "id", "title", class_="cell")
+    eq_(td("Foo", id="c1"), HTML.td("Foo", id="c1", class_="cell"))
+    eq_(td(c="<Foo>", title='"x"'),
+        HTML.td(c="<Foo>", title='"x"', class_="cell"))
+    eq_(td(), literal(u'<td class="cell"></td>'))
+    assert type(td()) is literal
+    # Undeclared attributes fall back to make_tag.
+    eq_(td("Foo", style="a"), HTML.td("Foo", style="a", class_="cell"))
+
+def test_compiled_tag_defaults():
+    td = HTML.compile("td", "class_", class_="even", align="left")
+    eq_(td("A"), literal(u'<td align="left" class="even">A</td>'))
+    eq_(td("A", class_="odd"), literal(u'<td align="left" class="odd">A</td>'))
+    eq_(td("A", class_=None), literal(u'<td align="left">A</td>'))
+
+def test_compiled_tag_flags():
+    br = HTML.compile("br", _nl=True)
+    eq_(br(), HTML.br(_nl=True))
+    form = HTML.compile("form", "action", _closed=False)
+    eq_(form(action="/"), HTML.form(action="/", _closed=False))
+    a = HTML.compile("a", "href", _nl=True)
+    eq_(a("A", "B", href="/"), HTML.a("A", "B", href="/", _nl=True))
+    # Flags given at call time override the compiled ones.
+    eq_(a("A", href="/", _nl=False), HTML.a("A", href="/"))
+    eq_(br(_nl=False), HTML.br())
+    eq_(form(action="/", _closed=True), HTML.form(action="/"))
+
+def test_lazy_matches_eager():
+    def build(h):
+        rows = [h.tr(h.td(i, class_="n"), h.td("<%d>" % i)) for i in range(3)]
+        return h.table(c=[h.caption("x", _nl=True), h.br()] + rows)
+    lazy = build(HTML.lazy)
+    eq_(literal(lazy), build(HTML))
+    eq_(escape(lazy), build(HTML))
+    eq_(HTML.div(lazy), HTML.div(build(HTML)))
+
+def test_lazy_flags():
+    L = HTML.lazy
+    eq_(literal(L.a("A", "B", href="/", _nl=True)),
+        HTML.a("A", "B", href="/", _nl=True))
+    eq_(literal(L.form(_closed=False, _nl=True)),
+        HTML.form(_closed=False, _nl=True))
+    eq_(literal(L.br(_nl=True)), HTML.br(_nl=True))
+    eq_(literal(L("<a>", L.b("x"))), HTML("<a>", HTML.b("x")))
+
+def test_lazy_generator_content():
+    consumed = []
+    def rows():
+        for i in range(3):
+            consumed.append(i)
+            yield HTML.lazy.tr(HTML.lazy.td(i))
+    table = HTML.lazy.table(c=rows())
+    eq_(consumed, [])
+    chunks = table.iter_chunks()
+    eq_(chunks.next(), u"<table>")
+    eq_(consumed, [])
+    eq_(u"".join(chunks),
+        u"<tr><td>0</td></tr><tr><td>1</td></tr><tr><td>2</td></tr></table>")
+
+def test_frozen_attrs():
+    attrs = FrozenAttrs(class_="pager_link", title="<x>", id=None)
+    eq_(HTML.a("2", href="/", _attrs=attrs),
+        HTML.a("2", href="/", class_="pager_link", title="<x>"))
+    eq_(HTML.a("2", _attrs=attrs, title=None),
+        literal(u'<a class="pager_link">2</a>'))
+    eq_(HTML.a("2", _attrs=attrs, class_="x"),
+        literal(u'<a class="x" title="&lt;x&gt;">2</a>'))
+    eq_(attrs, FrozenAttrs(title="<x>", id=None, class_="pager_link"))
+    eq_(hash(attrs), hash(FrozenAttrs(title="<x>", id=None, class_="pager_link")))
+    assert attrs != FrozenAttrs(class_="pager_link")
+    eq_(HTML.compile("a", "href", _attrs=attrs)("2", href="/"),
+        HTML.a("2", href="/", _attrs=attrs))
@@ -36,3 +36,16 @@ def test_subclasses_only_with_exclude():
     subclasses.sort(key=by_name)
     control = [EarlGrey, EnglishBreakfast, JasminePearl, Sencha]
     eq_(subclasses, control)
+
+def test_lazy_module():
+    import webhelpers.containers
+    mod = LazyModule("webhelpers.containers")
+    assert "not loaded" in repr(mod)
+    assert mod.LRUCache is webhelpers.containers.LRUCache
+    assert "(loaded)" in repr(mod)
+    try:
+        mod.no_such_attribute
+    except AttributeError:
+        pass
+    else:
+        raise AssertionError("AttributeError not raised")
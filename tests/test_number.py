@@ -30,6 +30,21 @@ class TestFormatNumber(object):
         eq_(format_number(-1234.5, ".", ","), "-1.234,5")
 
 
+class TestFormatNumbers(object):
+    def test_ints(self):
+        numbers = [1234567, -1234, 123, 0, 10 ** 20, -1]
+        eq_(format_numbers(numbers), [format_number(n) for n in numbers])
+        eq_(format_numbers(numbers, " "), [format_number(n, " ") for n in numbers])
+
+    def test_floats(self):
+        numbers = [1234567.89, -1234.5, 1234, 0.12345]
+        eq_(format_numbers(numbers, ".", ","),
+            [format_number(n, ".", ",") for n in numbers])
+
+    def test_empty(self):
+        eq_(format_numbers([]), [])
+
+
 class TestFormatDataSize(object):
     def test_bytes(self):
         eq_(  format_byte_size(1),  '1 B')
@@ -1,9 +1,13 @@
 """"Test webhelpers.paginate package."""
+import os
+import pickle
 import sys
+import tempfile
+import threading
 import unittest
 
 from nose.plugins.skip import SkipTest
-from nose.tools import eq_, raises
+from nose.tools import eq_, raises, assert_raises
 from routes import Mapper
 from webob.multidict import MultiDict
 
@@ -73,6 +77,313 @@ def test_many_pages():
         eq_(page.pager(onclick="load('%s')"), '<span class="pager_curpage">1</span> <a class="pager_link" href="/content?page=2" onclick="load(&#39;/content?partial=1&amp;page=2&#39;)">2</a> <a class="pager_link" href="/content?page=3" onclick="load(&#39;/content?partial=1&amp;page=3&#39;)">3</a> <span class="pager_dotdot">..</span> <a class="pager_link" href="/content?page=7" onclick="load(&#39;/content?partial=1&amp;page=7&#39;)">7</a>')
         eq_(page.pager(onclick="load('$partial_url')"), '<span class="pager_curpage">1</span> <a class="pager_link" href="/content?page=2" onclick="load(&#39;/content?partial=1&amp;page=2&#39;)">2</a> <a class="pager_link" href="/content?page=3" onclick="load(&#39;/content?partial=1&amp;page=3&#39;)">3</a> <span class="pager_dotdot">..</span> <a class="pager_link" href="/content?page=7" onclick="load(&#39;/content?partial=1&amp;page=7&#39;)">7</a>')
 
+def test_pager_url_templates():
+    calls = []
+    def counting_generator(**kw):
+        calls.append(kw)
+        return url_generator(**kw)
+    page = paginate.Page(range(1000), page=25, url=counting_generator)
+    expected = '<a class="pager_link" href="/content?page=1">1</a> <span class="pager_dotdot">..</span> <a class="pager_link" href="/content?page=20">20</a> <a class="pager_link" href="/content?page=21">21</a> <a class="pager_link" href="/content?page=22">22</a> <a class="pager_link" href="/content?page=23">23</a> <a class="pager_link" href="/content?page=24">24</a> <span class="pager_curpage">25</span> <a class="pager_link" href="/content?page=26">26</a> <a class="pager_link" href="/content?page=27">27</a> <a class="pager_link" href="/content?page=28">28</a> <a class="pager_link" href="/content?page=29">29</a> <a class="pager_link" href="/content?page=30">30</a> <span class="pager_dotdot">..</span> <a class="pager_link" href="/content?page=50">50</a>'
+    eq_(page.pager('~5~'), expected)
+    # One call for the template, and two to check it with pages 1 and 2.
+    eq_(len(calls), 3)
+    del calls[:]
+    page.pager('~5~', onclick="go('$partial_url', $page)")
+    eq_(len(calls), 6)
+
+    # Generators which can't be templated are called for every link.
+    def special_first_page(page):
+        if page == 1:
+            return "/content"
+        return "/content?page=%s" % page
+    page = paginate.Page(range(1000), page=25, url=special_first_page)
+    eq_(page.pager('~5~'), expected.replace("/content?page=1", "/content"))
+    # Page 1 isn't the first link.
+    eq_(page.pager('$link_last $link_first'), '<a class="pager_link" href="/content?page=50">&gt;&gt;</a> <a class="pager_link" href="/content">&lt;&lt;</a>')
+    eq_(page.pager('$link_next ~2~'), page.pager('$link_next') + ' ' + page.pager('~2~'))
+    assert 'href="/content"' in page.pager('$link_next ~2~')
+    def int_only(page):
+        return "/content?page=%d" % page
+    page = paginate.Page(range(1000), page=25, url=int_only)
+    eq_(page.pager('~5~'), expected)
+
+def test_has_more():
+    items = range(100)
+    page = paginate.Page(items, page=2, items_per_page=15,
+        counter=paginate.HasMore(), url=url_generator)
+    eq_(list(page), range(15, 30))
+    assert page.item_count is None
+    assert page.page_count is None
+    eq_(page.first_item, 16)
+    eq_(page.last_item, 30)
+    eq_(page.previous_page, 1)
+    eq_(page.next_page, 3)
+    eq_(page.last_page, 3)
+    eq_(page.pager('$link_first $link_previous ~2~ $link_next $link_last'), '<a class="pager_link" href="/content?page=1">&lt;&lt;</a> <a class="pager_link" href="/content?page=1">&lt;</a> <a class="pager_link" href="/content?page=1">1</a> <span class="pager_curpage">2</span> <a class="pager_link" href="/content?page=3">3</a> <a class="pager_link" href="/content?page=3">&gt;</a> ')
+    page = paginate.Page(items, page=7, items_per_page=15,
+        counter=paginate.HasMore())
+    eq_(list(page), range(90, 100))
+    assert page.next_page is None
+    eq_(page.last_page, 7)
+    page = paginate.Page(items, page=1, items_per_page=100,
+        counter=paginate.HasMore())
+    eq_(len(page), 100)
+    assert page.next_page is None
+    eq_(page.pager(), '')
+
+def test_estimated_count():
+    items = range(100)
+    page = paginate.Page(items, page=2, items_per_page=15,
+        counter=paginate.EstimatedCount(lambda coll: 120.0))
+    eq_(page.item_count, 120)
+    eq_(page.page_count, 8)
+    eq_(list(page), range(15, 30))
+
+def test_concurrent_count():
+    items = range(100)
+    page = paginate.Page(items, page=3, items_per_page=15,
+        counter=paginate.ConcurrentCount())
+    eq_(page.item_count, 100)
+    eq_(list(page), range(30, 45))
+    page = paginate.Page(items, page=30, items_per_page=15,
+        counter=paginate.ConcurrentCount())
+    eq_(page.page, 7)
+    eq_(list(page), range(90, 100))
+
+def test_concurrent_count_threads():
+    counted_in = []
+    class Items(list):
+        def __len__(self):
+            counted_in.append(threading.currentThread())
+            return list.__len__(self)
+    # Sequences are counted inline.
+    paginate.Page(Items(range(10)), counter=paginate.ConcurrentCount())
+    eq_(counted_in, [threading.currentThread()])
+    # Adapters with detached_len() are counted in another thread.
+    class DetachedAdapter(paginate.CollectionAdapter):
+        def count(self):
+            return len(self.obj)
+        def detached_len(self):
+            counted_in.append(threading.currentThread())
+            return len(self.obj)
+        def slice(self, start, stop):
+            return self.obj[start:stop]
+    del counted_in[:]
+    page = paginate.Page(DetachedAdapter(range(30)), page=2,
+        counter=paginate.ConcurrentCount())
+    eq_(page.item_count, 30)
+    eq_(list(page), range(20, 30))
+    assert counted_in[0] is not threading.currentThread()
+
+@raises(ZeroDivisionError)
+def test_concurrent_count_error():
+    class BadLength(list):
+        def __len__(self):
+            return 1 / 0
+    paginate.Page(BadLength(range(10)), counter=paginate.ConcurrentCount())
+
+class Shelf(object):
+    """A collection type unknown to paginate."""
+    def __init__(self, books):
+        self.books = books
+
+class ShelfAdapter(paginate.CollectionAdapter):
+    def count(self):
+        return len(self.obj.books)
+    def slice(self, start, stop):
+        return self.obj.books[start:stop]
+
+def test_register_adapter():
+    shelf = Shelf(range(50))
+    try:
+        paginate.Page(shelf)
+    except TypeError:
+        pass
+    else:
+        raise AssertionError("Shelf was paged without an adapter")
+    paginate.register_adapter(Shelf, ShelfAdapter)
+    try:
+        page = paginate.Page(shelf, page=3, items_per_page=20)
+        eq_(page.item_count, 50)
+        eq_(list(page), range(40, 50))
+    finally:
+        paginate.unregister_adapter(Shelf, ShelfAdapter)
+    assert_raises(TypeError, paginate.Page, shelf)
+    assert_raises(ValueError, paginate.unregister_adapter, Shelf)
+
+def test_adapter_without_cheap_count():
+    class ExpensiveShelfAdapter(ShelfAdapter):
+        cheap_count = False
+        def count(self):
+            raise AssertionError("counted")
+    page = paginate.Page(ExpensiveShelfAdapter(Shelf(range(50))), page=2)
+    assert page.item_count is None
+    eq_(list(page), range(20, 40))
+    eq_(page.next_page, 3)
+    # An explicit counter is still used.
+    page = paginate.Page(ExpensiveShelfAdapter(Shelf(range(50))), page=2,
+        item_count=50)
+    eq_(page.page_count, 3)
+
+def test_search_results():
+    calls = []
+    def search(offset, limit):
+        calls.append((offset, limit))
+        return iter(range(1000)[offset:offset+limit]), 1000
+    results = paginate.SearchResults(search)
+    assert results.obj is search
+    page = paginate.Page(results, page=4)
+    eq_(page.item_count, 1000)
+    eq_(list(page), range(60, 80))
+    eq_(calls, [(60, 20)])
+    del calls[:]
+    page = paginate.Page(paginate.SearchResults(search), page=60)
+    eq_(page.page, 50)
+    eq_(list(page), range(980, 1000))
+    eq_(calls, [(1180, 20), (980, 20)])
+
+def test_dbapi_query():
+    try:
+        import sqlite3
+    except ImportError:
+        raise SkipTest()
+    conn = sqlite3.connect(":memory:")
+    conn.execute("CREATE TABLE notes (id INTEGER PRIMARY KEY, color TEXT)")
+    conn.executemany("INSERT INTO notes VALUES (?, ?)",
+        [(i, ["red", "blue"][i % 2]) for i in range(1, 101)])
+    query = paginate.DBAPIQuery(conn,
+        "SELECT id FROM notes WHERE color = ? ORDER BY id", ("red",))
+    page = paginate.Page(query, page=2, items_per_page=15)
+    eq_(page.item_count, 50)
+    eq_([row[0] for row in page], range(32, 62, 2))
+    eq_(query.obj, query.sql)
+    conn.close()
+
+def test_stream_generator():
+    consumed = []
+    def numbers():
+        for i in xrange(1000000):
+            consumed.append(i)
+            yield i
+    page = paginate.Page(numbers(), page=3, items_per_page=10,
+        url=url_generator)
+    eq_(list(page), range(20, 30))
+    assert page.item_count is None
+    eq_(page.first_item, 21)
+    eq_(page.previous_page, 2)
+    eq_(page.next_page, 4)
+    # Only the page and the item after it were read.
+    eq_(len(consumed), 31)
+    eq_(page.pager(), '<a class="pager_link" href="/content?page=2">&lt;</a> <a class="pager_link" href="/content?page=4">&gt;</a>')
+    page = paginate.Page((x for x in range(25)), page=3, items_per_page=10,
+        url=url_generator)
+    eq_(list(page), range(20, 25))
+    assert page.next_page is None
+    eq_(page.pager(), '<a class="pager_link" href="/content?page=2">&lt;</a> ')
+
+def test_stream_iterator():
+    lines = iter(["a\n", "b\n", "c\n"])
+    page = paginate.Page(lines, page=1, items_per_page=2)
+    eq_(list(page), ["a\n", "b\n"])
+    eq_(page.next_page, 2)
+    page = paginate.Page(paginate.IteratorAdapter(xrange(5)), page=2,
+        items_per_page=2)
+    eq_(list(page), [2, 3])
+    # The count can still be given.
+    page = paginate.Page(paginate.IteratorAdapter(xrange(5)), page=2,
+        items_per_page=2, item_count=5)
+    eq_(page.page_count, 3)
+
+class KeyedShelfAdapter(ShelfAdapter):
+    def __init__(self, obj, key="shelf"):
+        ShelfAdapter.__init__(self, obj)
+        self.key = key
+        self.slices = []
+    def cache_key(self):
+        return self.key
+    def slice(self, start, stop):
+        self.slices.append((start, stop))
+        return ShelfAdapter.slice(self, start, stop)
+
+def test_window_cache():
+    cache = paginate.WindowCache(3)
+    shelf = KeyedShelfAdapter(Shelf(range(100)))
+    page = paginate.Page(shelf, page=1, items_per_page=10, window_cache=cache)
+    eq_(list(page), range(10))
+    for number in [2, 3, 1]:
+        page = paginate.Page(shelf, page=number, items_per_page=10,
+            window_cache=cache)
+        eq_(list(page), range(number * 10 - 10, number * 10))
+    page = paginate.Page(shelf, page=4, items_per_page=10, window_cache=cache)
+    eq_(list(page), range(30, 40))
+    page = paginate.Page(shelf, page=10, items_per_page=10,
+        window_cache=cache)
+    eq_(list(page), range(90, 100))
+    eq_(shelf.slices, [(0, 30), (30, 60), (90, 120)])
+    # A different query has its own windows.
+    other = KeyedShelfAdapter(Shelf(range(100, 200)), "other")
+    page = paginate.Page(other, page=2, items_per_page=10,
+        window_cache=cache)
+    eq_(list(page), range(110, 120))
+    # A different page size has its own windows.
+    page = paginate.Page(shelf, page=2, items_per_page=5, window_cache=cache)
+    eq_(list(page), range(5, 10))
+    eq_(shelf.slices[-1], (0, 15))
+    # Uncounted pages can span two windows.
+    del shelf.slices[:]
+    page = paginate.Page(shelf, page=3, items_per_page=10,
+        window_cache=cache, counter=paginate.HasMore())
+    eq_(list(page), range(20, 30))
+    eq_(page.next_page, 4)
+    eq_(shelf.slices, [])
+
+def test_window_cache_invalidate():
+    cache = paginate.WindowCache(3)
+    books = range(100)
+    shelf = KeyedShelfAdapter(Shelf(books))
+    eq_(list(paginate.Page(shelf, 2, 10, window_cache=cache)), range(10, 20))
+    books[10] = "new"
+    eq_(list(paginate.Page(shelf, 2, 10, window_cache=cache))[0], 10)
+    cache.invalidate(shelf)
+    eq_(list(paginate.Page(shelf, 2, 10, window_cache=cache))[0], "new")
+    books[11] = "newer"
+    cache.clear()
+    eq_(list(paginate.Page(shelf, 2, 10, window_cache=cache))[1], "newer")
+    # Uncacheable collections are sliced every time.
+    eq_(list(paginate.Page(books, 2, 10, window_cache=cache))[:2],
+        ["new", "newer"])
+
+def test_window_cache_ttl():
+    cache = paginate.WindowCache(3, ttl=-1)
+    shelf = KeyedShelfAdapter(Shelf(range(100)))
+    paginate.Page(shelf, 1, 10, window_cache=cache)
+    paginate.Page(shelf, 2, 10, window_cache=cache)
+    eq_(shelf.slices, [(0, 30), (0, 30)])
+
+def test_page_info():
+    page = paginate.Page(range(100), page=3, items_per_page=15,
+        url=url_generator)
+    info = page.info()
+    assert info.items is page.items
+    eq_(list(info), range(30, 45))
+    eq_(len(info), 15)
+    eq_(info[0], 30)
+    eq_(info.page_count, 7)
+    eq_(repr(info), "<PageInfo page 3 of 7, items 31-45 of 100>")
+    for protocol in [0, 2]:
+        copy = pickle.loads(pickle.dumps(info, protocol))
+        for name in paginate.PageInfo.__slots__:
+            eq_(getattr(copy, name), getattr(info, name))
+    new_page = copy.to_page(url=url_generator)
+    eq_(list(new_page), range(30, 45))
+    eq_(new_page.pager(), page.pager())
+    eq_(new_page.pager("$link_first $first_item-$last_item of $item_count"),
+        '<a class="pager_link" href="/content?page=1">&lt;&lt;</a> 31-45 of 100')
+    # Uncounted pages keep their next page.
+    page = paginate.Page(range(100), page=3, counter=paginate.HasMore())
+    page = pickle.loads(pickle.dumps(page.info(), 2)).to_page(url_generator)
+    eq_(page.pager(), '<a class="pager_link" href="/content?page=2">&lt;</a> <a class="pager_link" href="/content?page=4">&gt;</a>')
+
 def test_make_page_url():
     purl = paginate.make_page_url("/articles", {}, 2)
     eq_(purl, "/articles?page=2")
@@ -112,6 +423,86 @@ def test_pageurl_webob():
     purl = paginate.PageURL_WebOb(request, qualified=True)
     eq_(purl(2), "http://localhost:5000/articles?blah=boo&page=2")
 
+    eq_(purl(2, after="5"), "http://localhost:5000/articles?after=5&blah=boo&page=2")
+
+def test_pageurl_override():
+    params = {"foo": "bar", "page": "3", "after": "7"}
+    purl = paginate.PageURL("/articles", params)
+    eq_(purl(after=9, before=None), "/articles?after=9&foo=bar&page=3")
+    eq_(purl(after=None, before=4), "/articles?before=4&foo=bar&page=3")
+    eq_(params["after"], "7")
+
+def test_keyset_page():
+    items = range(0, 100, 2)
+    page = paginate.KeysetPage(items, lambda x: x, items_per_page=15)
+    eq_(list(page), range(0, 30, 2))
+    assert page.previous_cursor is None
+    eq_(page.next_cursor, 28)
+    page = paginate.KeysetPage(items, lambda x: x, after=28,
+        items_per_page=15)
+    eq_(list(page), range(30, 60, 2))
+    eq_(page.previous_cursor, 30)
+    eq_(page.next_cursor, 58)
+    # Cursors needn't be keys in the collection.
+    page = paginate.KeysetPage(items, lambda x: x, after=81,
+        items_per_page=15)
+    eq_(list(page), range(82, 100, 2))
+    eq_(page.previous_cursor, 82)
+    assert page.next_cursor is None
+    # Nothing before the first item, so no previous page.
+    page = paginate.KeysetPage(items, lambda x: x, after=-5,
+        items_per_page=15)
+    eq_(list(page), range(0, 30, 2))
+    assert page.previous_cursor is None
+    eq_(page.next_cursor, 28)
+    page = paginate.KeysetPage(items, lambda x: x, before=30,
+        items_per_page=15)
+    eq_(list(page), range(0, 30, 2))
+    assert page.previous_cursor is None
+    eq_(page.next_cursor, 28)
+    page = paginate.KeysetPage(items, lambda x: x, before=60,
+        items_per_page=15)
+    eq_(list(page), range(30, 60, 2))
+    eq_(page.previous_cursor, 30)
+    eq_(page.next_cursor, 58)
+
+def test_keyset_page_walk():
+    items = range(47)
+    seen = []
+    after = None
+    while True:
+        page = paginate.KeysetPage(items, lambda x: x, after=after,
+            items_per_page=10)
+        seen.extend(page)
+        after = page.next_cursor
+        if after is None:
+            break
+    eq_(seen, items)
+    seen = []
+    before = 47
+    while before is not None:
+        page = paginate.KeysetPage(items, lambda x: x, before=before,
+            items_per_page=10)
+        seen[:0] = page
+        before = page.previous_cursor
+    eq_(seen, items)
+
+def test_keyset_pager():
+    items = range(100)
+    purl = paginate.PageURL("/content", {"after": "9", "q": "x"})
+    page = paginate.KeysetPage(items, lambda x: x, after=9,
+        items_per_page=10, url=purl)
+    eq_(page.pager(), '<a class="pager_link" href="/content?before=10&amp;q=x">&lt;</a> <a class="pager_link" href="/content?after=19&amp;q=x">&gt;</a>')
+    eq_(page.pager('$link_next', after_param="a", symbol_next="more"),
+        '<a class="pager_link" href="/content?a=19&amp;after=9&amp;q=x">more</a>')
+    page = paginate.KeysetPage(items, lambda x: x, items_per_page=10,
+        url=purl)
+    eq_(page.pager(), ' <a class="pager_link" href="/content?after=9&amp;q=x">&gt;</a>')
+    page = paginate.KeysetPage(items, lambda x: x, items_per_page=100,
+        url=purl)
+    eq_(page.pager(), '')
+    eq_(page.pager(show_if_single_page=True), ' ')
+
 
 class UnsliceableSequence(object):
    def __init__(self, seq):
@@ -182,24 +573,222 @@ class TestSQLAlchemyCollectionTypes(unittest.TestCase):
         eq_(records[0].id, 1)
         eq_(records[-1].id, 20)
 
-    '''
-    # The following test fails:
-    #Traceback (most recent call last):
-    #  File "WebHelpers/tests/test_paginate.py", line 181, in test_sqlalchemy_select
-    #    page = paginate.Page(sql, sqlalchemy_session=session)
-    #  File "WebHelpers/webhelpers/paginate.py", line 407, in __init__
-    #    self.item_count = len(self.collection)
-    #ValueError: __len__() should return >= 0
-    #
-    #(Pdb) p len(self.collection)
-    #*** ValueError: ValueError('__len__() should return >= 0',)
-    #(Pdb) p self.collection.__len__()
-    #-1
+    def test_count_cache(self):
+        session = self.sessionmaker()
+        counter = paginate.CountCache(60)
+        q = session.query(self.Note)
+        page = paginate.Page(q, counter=counter)
+        eq_(page.item_count, 100)
+        self.engine.execute(self.notes.delete().where(self.notes.c.id > 50))
+        page = paginate.Page(q, counter=counter)
+        eq_(page.item_count, 100)
+        eq_(counter.backend.hits, 1)
+        # A different query is counted separately.
+        q2 = q.filter(self.Note.id > 10)
+        eq_(paginate.Page(q2, counter=counter).item_count, 40)
+        q2 = q.filter(self.Note.id > 20)
+        eq_(paginate.Page(q2, counter=counter).item_count, 30)
+        counter.clear()
+        eq_(paginate.Page(q, counter=counter).item_count, 50)
+        counter = paginate.CountCache(-1)
+        eq_(paginate.Page(q, counter=counter).item_count, 50)
+        self.engine.execute(self.notes.delete().where(self.notes.c.id > 40))
+        eq_(paginate.Page(q, counter=counter).item_count, 40)
+
+    def test_count_cache_binds(self):
+        import sqlalchemy as sa
+        import sqlalchemy.orm as orm
+        # The same query on another database is counted separately.
+        fd, path = tempfile.mkstemp(suffix=".db")
+        os.close(fd)
+        try:
+            engine = sa.create_engine("sqlite:///" + path)
+            self.notes.tometadata(sa.MetaData()).create(engine)
+            engine.execute(self.notes.insert(),
+                [{"id": x} for x in range(1, 31)])
+            counter = paginate.CountCache(60)
+            q = self.sessionmaker().query(self.Note)
+            eq_(paginate.Page(q, counter=counter).item_count, 100)
+            session = orm.sessionmaker(bind=engine)()
+            q = session.query(self.Note)
+            eq_(paginate.Page(q, counter=counter).item_count, 30)
+            eq_(counter.backend.hits, 0)
+            sql = self.notes.select().where(self.notes.c.id > 10)
+            page = paginate.Page(sql, sqlalchemy_session=session,
+                counter=counter)
+            eq_(page.item_count, 20)
+            eq_(paginate.Page(sql, sqlalchemy_session=self.sessionmaker(),
+                counter=counter).item_count, 90)
+            eq_(counter.backend.hits, 0)
+            session.close()
+            engine.dispose()
+        finally:
+            os.remove(path)
+
+    def test_sqlalchemy_has_more(self):
+        session = self.sessionmaker()
+        q = session.query(self.Note).order_by(self.Note.id)
+        page = paginate.Page(q, page=5, counter=paginate.HasMore())
+        eq_([x.id for x in page], range(81, 101))
+        assert page.next_page is None
+        page = paginate.Page(q, page=4, counter=paginate.HasMore())
+        eq_(page.next_page, 5)
+
+    def test_sqlalchemy_concurrent_count(self):
+        import sqlalchemy as sa
+        import sqlalchemy.orm as orm
+        # Each thread needs its own connection, so use a file.
+        fd, path = tempfile.mkstemp(suffix=".db")
+        os.close(fd)
+        try:
+            engine = sa.create_engine("sqlite:///" + path)
+            self.notes.tometadata(sa.MetaData()).create(engine)
+            engine.execute(self.notes.insert(),
+                [{"id": x} for x in range(1, 51)])
+            session = orm.sessionmaker(bind=engine)()
+            q = session.query(self.Note)
+            page = paginate.Page(q, page=2,
+                counter=paginate.ConcurrentCount())
+            eq_(page.item_count, 50)
+            eq_([x.id for x in page], range(21, 41))
+            sql = self.notes.select()
+            page = paginate.Page(sql, page=5, sqlalchemy_session=session,
+                counter=paginate.ConcurrentCount())
+            eq_(page.item_count, 50)
+            eq_(page.page, 3)
+            eq_([x.id for x in page], range(41, 51))
+            session.close()
+            engine.dispose()
+        finally:
+            os.remove(path)
+
+    def test_sqlalchemy_window_cache(self):
+        session = self.sessionmaker()
+        cache = paginate.WindowCache(2)
+        q = session.query(self.Note).order_by(self.Note.id)
+        page = paginate.Page(q, page=1, window_cache=cache)
+        eq_([x.id for x in page], range(1, 21))
+        self.engine.execute(self.notes.delete().where(self.notes.c.id < 40))
+        page = paginate.Page(q, page=2, window_cache=cache)
+        eq_([x.id for x in page], range(21, 41))
+        # An equivalent query finds the same windows.
+        q2 = session.query(self.Note).order_by(self.Note.id)
+        cache.invalidate(q2)
+        page = paginate.Page(q, page=1, window_cache=cache)
+        eq_([x.id for x in page], range(40, 60))
+
+    def test_sqlalchemy_window_cache_sessions(self):
+        import sqlalchemy.orm as orm
+        cache = paginate.WindowCache(2)
+        session = self.sessionmaker()
+        q = session.query(self.Note).order_by(self.Note.id)
+        page = paginate.Page(q, page=1, window_cache=cache)
+        assert orm.object_session(page[0]) is session
+        # Another request gets its own objects, in its own session.
+        session2 = self.sessionmaker()
+        q2 = session2.query(self.Note).order_by(self.Note.id)
+        page = paginate.Page(q2, page=2, window_cache=cache)
+        # The generation token and the window.
+        eq_(cache.backend.hits, 2)
+        eq_([x.id for x in page], range(21, 41))
+        for note in page:
+            assert orm.object_session(note) is session2
+        # The stored copies are detached.
+        stored = cache.backend.cache
+        for value in [stored.get(key) for key in stored.keys()]:
+            if isinstance(value, tuple):
+                for note in value[1]:
+                    assert orm.object_session(note) is None
+        # Rows combining objects and columns aren't cached.
+        q3 = session.query(self.Note, (self.Note.id * 2).label("double"))
+        q3 = q3.order_by(self.Note.id)
+        page = paginate.Page(q3, page=1, window_cache=cache)
+        eq_(page[0][1], 2)
+        hits = cache.backend.hits
+        page = paginate.Page(q3, page=2, window_cache=cache)
+        eq_(page[0][1], 42)
+        eq_(cache.backend.hits, hits + 1)
+        # Nor are objects with unsaved changes.
+        note = session.query(self.Note).get(45)
+        note.id = 1045
+        q4 = session.query(self.Note).filter(self.Note.id > 40)
+        q4 = q4.order_by(self.Note.id).autoflush(False)
+        page = paginate.Page(q4, page=1, window_cache=cache)
+        eq_(page[4].id, 1045)
+        hits = cache.backend.hits
+        page = paginate.Page(q4, page=1, window_cache=cache)
+        eq_(cache.backend.hits, hits + 1)
+
+    def test_sqlalchemy_keyset_orm(self):
+        session = self.sessionmaker()
+        q = session.query(self.Note)
+        page = paginate.KeysetPage(q, self.Note.id, after=20)
+        eq_([x.id for x in page], range(21, 41))
+        eq_(page.previous_cursor, 21)
+        eq_(page.next_cursor, 40)
+        page = paginate.KeysetPage(q, self.Note.id, before=21)
+        eq_([x.id for x in page], range(1, 21))
+        assert page.previous_cursor is None
+        eq_(page.next_cursor, 20)
+        page = paginate.KeysetPage(q, self.Note.id, after=90)
+        eq_([x.id for x in page], range(91, 101))
+        assert page.next_cursor is None
+        page = paginate.KeysetPage(q, self.Note.id, after=0)
+        eq_([x.id for x in page], range(1, 21))
+        assert page.previous_cursor is None
+
+    def test_sqlalchemy_keyset_select(self):
+        session = self.sessionmaker()
+        sql = self.notes.select()
+        page = paginate.KeysetPage(sql, self.notes.c.id, after=95,
+            items_per_page=3, sqlalchemy_session=session)
+        eq_([x.id for x in page], [96, 97, 98])
+        eq_(page.previous_cursor, 96)
+        eq_(page.next_cursor, 98)
+        page = paginate.KeysetPage(sql, self.notes.c.id, before=96,
+            items_per_page=3, sqlalchemy_session=session)
+        eq_([x.id for x in page], [93, 94, 95])
+        eq_(page.previous_cursor, 93)
+
     def test_sqlalchemy_select(self):
         session = self.sessionmaker()
         sql = self.notes.select(order_by=[self.notes.columns.id])
         page = paginate.Page(sql, sqlalchemy_session=session)
-        records = self.engine.execute(page).fetchall()
+        eq_(page.item_count, 100)
+        records = list(page)
         eq_(records[0].id, 1)
         eq_(records[-1].id, 20)
-    '''
+        sql = sql.where(self.notes.c.id > 90)
+        page = paginate.Page(sql, page=2, items_per_page=8,
+            sqlalchemy_session=session)
+        eq_(page.item_count, 10)
+        eq_([x.id for x in page], [99, 100])
+
+    def test_sqlalchemy_window_count(self):
+        session = self.sessionmaker()
+        sql = self.notes.select(order_by=[self.notes.columns.id])
+        collection = paginate.get_wrapper(sql, session)
+        if not collection._window_functions():
+            raise SkipTest()
+        rows, total = collection.slice_and_count(10, 15)
+        eq_(total, 100)
+        eq_([x.id for x in rows], range(11, 16))
+        rows, total = collection.slice_and_count(100, 120)
+        eq_(rows, [])
+        assert total is None
+        page = paginate.Page(sql, page=3, sqlalchemy_session=session,
+            counter=paginate.WindowCount())
+        eq_(page.item_count, 100)
+        eq_([x.id for x in page], range(41, 61))
+        eq_(page[0].paginate_total, 100)
+        # A page past the end is counted separately and clamped.
+        page = paginate.Page(sql, page=9, sqlalchemy_session=session,
+            counter=paginate.WindowCount())
+        eq_(page.page, 5)
+        eq_([x.id for x in page], range(81, 101))
+        # Compound selects are counted separately.
+        union = self.notes.select().union(self.notes.select())
+        page = paginate.Page(union, page=2, sqlalchemy_session=session,
+            counter=paginate.WindowCount())
+        eq_(page.item_count, 100)
+        eq_(len(page), 20)
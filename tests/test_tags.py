@@ -156,6 +156,36 @@ class TestFormTagHelper(object):
 
     def test_id_and_id_(self):
         raises(TypeError, text, "spam", "pizza", id="fubar", id_="eggs")
+
+    def test_select_cached_options(self):
+        data = [("a", "A"), (2, "<Two>"), ([("g1", "G1"), ("g2", "G2")], "G")]
+        opts = Options(data)
+        for selected in [None, "a", [2, "g2"], ["g1", "a"], []]:
+            eq_(select("x", selected, opts, prompt="Pick"),
+                select("x", selected, data, prompt="Pick"))
+            eq_(select("x", selected, opts), select("x", selected, data))
+        eq_(len(opts.render_cache), 5)
+        eq_(opts.render(["a"]), opts.render([u"a"]))
+        eq_(len(opts.render_cache), 5)
+        eq_(select("x", None, [], prompt="Pick"),
+            u'<select id="x" name="x">\n<option selected="selected" value="">Pick</option>\n</select>')
+
+    def test_select_unhashable_values(self):
+        class Code(object):
+            # Unhashable, but equal to its string form.
+            __hash__ = None
+            def __init__(self, code):
+                self.code = code
+            def __eq__(self, other):
+                return unicode(self.code) == other
+            def __unicode__(self):
+                return unicode(self.code)
+        # Option objects keep their values as given.
+        data = [Option(Code("a"), "A"), Option({"b": 1}, "B")]
+        eq_(select("x", "a", data),
+            u'<select id="x" name="x">\n<option selected="selected" value="a">A</option>\n<option value="{&#39;b&#39;: 1}">B</option>\n</select>')
+        eq_(select("x", None, data),
+            u'<select id="x" name="x">\n<option value="a">A</option>\n<option value="{&#39;b&#39;: 1}">B</option>\n</select>')
         
 
     
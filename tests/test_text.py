@@ -2,6 +2,7 @@
 from util import WebHelpersTestCase
 import unittest
 
+from nose import SkipTest
 from nose.tools import eq_
 
 from webhelpers.text import *
@@ -46,3 +47,41 @@ class TestTextHelper(WebHelpersTestCase):
     def test_urlify(self):
         s = "What is this? It is a car."
         control = "What%20is%20this%3f%20It%20is%20a%20car."
+
+    def test_convert_misc_entities(self):
+        eq_(convert_misc_entities("&#8220;A&#8221; &amp; B&trade; &foo; &lt;"),
+            '"A" and B(tm)  <')
+        eq_(convert_misc_entities("&x &amp;"), "&x and")
+
+    def test_urlify_many(self):
+        titles = ["Mighty Mighty Bosstones", "  Fish &amp; <b>Chips</b>!? ",
+            "a--b  c", ""]
+        eq_(list(urlify_many(titles)), [urlify(x) for x in titles])
+        eq_(list(urlify_many(iter(titles[:1]))), ["mighty-mighty-bosstones"])
+
+    def test_slug_generator(self):
+        titles = ["News", "news", "News 2", "News", "<b>Other</b>"]
+        expected = ["news", "news-2", "news-2-2", "news-3", "other"]
+        eq_(list(SlugGenerator()(titles)), expected)
+        slugs = SlugGenerator(existing=["news", "news-3"])
+        eq_(list(slugs(["News", "News", "News"])), ["news-2", "news-4", "news-5"])
+        eq_(slugs.slug("news"), "news-6")
+        assert "news-6" in slugs.issued
+
+    def test_slug_generator_processes(self):
+        try:
+            import multiprocessing
+        except ImportError:
+            raise SkipTest("multiprocessing is not available")
+        titles = ["Title %d" % (i % 50) for i in range(200)]
+        eq_(list(SlugGenerator(processes=2, chunksize=10)(titles)),
+            list(SlugGenerator()(titles)))
+        read = []
+        def generate():
+            for title in titles:
+                read.append(title)
+                yield title
+        slugs = SlugGenerator(processes=2, chunksize=10)(generate())
+        slugs.next()
+        eq_(len(read), 20)
+        slugs.close()
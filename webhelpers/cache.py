@@ -0,0 +1,274 @@
+"""Caching for helpers whose output depends only on their arguments.
+
+Some helpers are expensive and are often called repeatedly with the same
+input; for instance, formatting the same comment body with ``markdown()`` on
+every page view.  This module caches their results.  The key is a hash of the
+helper's name and all its arguments, so a changed argument produces a new
+entry rather than a stale result.
+
+Caching is off by default.  To turn it on for the helpers in WebHelpers which
+support it (``converters.markdown``, ``converters.textilize``,
+``tools.auto_link``, and ``tools.highlight``), set a global backend::
+
+    from webhelpers import cache
+    cache.set_backend(cache.MemoryBackend(1000))
+
+Your own functions can use the ``cached`` decorator.  They may use the
+global backend like WebHelpers' helpers, or a backend of their own::
+
+    @cached(SQLiteBackend("/var/cache/myapp/fragments.db"))
+    def render_comment(text):
+        ...
+
+Only arguments of these types can be part of a key: strings, numbers, bools,
+None, lists, tuples, and dicts of these; modules, and module-level classes
+and functions (by name); and compiled regular expressions (by pattern and
+flags).  If an argument is of any other type, or is a lambda, a closure, or
+a nested function or class, the function is called without the cache.
+Results of None are never cached.  Keys include the WebHelpers version, so
+a persistent backend doesn't return results of an older version after an
+upgrade.
+
+A backend is an object with ``get(key)``, ``set(key, value)``,
+``delete(key)``, and ``clear()`` methods, like ``CacheBackend``.  ``get``
+returns None if the key is missing.  Keys are strings of hex digits.
+"""
+
+import cPickle
+import os
+import sys
+import threading
+import types
+
+try:
+    from hashlib import sha1
+except ImportError:   # Python < 2.5
+    from sha import new as sha1
+
+import webhelpers
+from webhelpers.containers import LRUCache
+
+__all__ = ["cached", "set_backend", "get_backend", "make_key",
+    "CacheBackend", "MemoryBackend", "SQLiteBackend"]
+
+_backend = None
+
+_KEY_SALT = "webhelpers-%s;" % webhelpers.__version__
+
+def set_backend(backend):
+    """Set the global backend used by ``cached()`` functions.
+
+    Pass None to turn off global caching.
+    """
+    global _backend
+    _backend = backend
+
+def get_backend():
+    """Return the global backend, or None if caching is off."""
+    return _backend
+
+
+class _Uncacheable(Exception):
+    """An argument can't be included in a cache key."""
+
+
+def _update_hash(h, value):
+    """Feed an unambiguous representation of ``value`` to the hash object.
+
+    Raise ``_Uncacheable`` if the value's type is not supported.
+    """
+    cls = type(value)
+    h.update(cls.__name__)
+    h.update(":")
+    if isinstance(value, unicode):
+        value = value.encode("utf-8")
+        h.update("%d:" % len(value))
+        h.update(value)
+    elif isinstance(value, str):
+        h.update("%d:" % len(value))
+        h.update(value)
+    elif value is None or isinstance(value, (bool, int, long, float)):
+        h.update(repr(value))
+    elif isinstance(value, (list, tuple)):
+        h.update("%d:" % len(value))
+        for item in value:
+            _update_hash(h, item)
+    elif isinstance(value, dict):
+        items = value.items()
+        items.sort()
+        _update_hash(h, items)
+    elif isinstance(value, types.ModuleType):
+        h.update(value.__name__)
+    elif isinstance(value, (types.FunctionType, types.ClassType, type)):
+        # Only module-level functions and classes are identified by their
+        # names; lambdas, closures, and nested ones aren't.
+        module = getattr(value, "__module__", None)
+        name = value.__name__
+        if getattr(sys.modules.get(module), name, None) is not value:
+            raise _Uncacheable(cls)
+        h.update(module)
+        h.update(".")
+        h.update(name)
+    elif hasattr(value, "pattern") and hasattr(value, "flags"):
+        # A compiled regular expression.
+        _update_hash(h, (value.pattern, value.flags))
+    else:
+        raise _Uncacheable(cls)
+    h.update(";")
+
+def make_key(name, args=(), kw=None):
+    """Return the cache key for calling function ``name`` with the arguments.
+
+    Return None if any argument is of an unsupported type.
+    """
+    h = sha1()
+    h.update(_KEY_SALT)
+    h.update(name)
+    try:
+        _update_hash(h, tuple(args))
+        _update_hash(h, kw or {})
+    except _Uncacheable:
+        return None
+    return h.hexdigest()
+
+
+def cached(backend=None):
+    """Decorator to cache a function's results.
+
+    If ``backend`` is None, use the global backend set by ``set_backend()``;
+    if that's None too, the function is called normally.
+    """
+    def decorator(func):
+        name = "%s.%s" % (func.__module__, func.__name__)
+        def wrapper(*args, **kw):
+            be = backend
+            if be is None:
+                be = _backend
+                if be is None:
+                    return func(*args, **kw)
+            key = make_key(name, args, kw)
+            if key is None:
+                return func(*args, **kw)
+            value = be.get(key)
+            if value is None:
+                value = func(*args, **kw)
+                if value is not None:
+                    be.set(key, value)
+            return value
+        wrapper.__name__ = func.__name__
+        wrapper.__doc__ = func.__doc__
+        wrapper.__module__ = func.__module__
+        wrapper.uncached = func
+        return wrapper
+    return decorator
+
+
+class CacheBackend(object):
+    """Base class documenting the backend interface."""
+
+    def get(self, key):
+        """Return the value for ``key``, or None if not cached."""
+        raise NotImplementedError("subclass responsibility")
+
+    def set(self, key, value):
+        """Store a value."""
+        raise NotImplementedError("subclass responsibility")
+
+    def delete(self, key):
+        """Remove a key if present."""
+        raise NotImplementedError("subclass responsibility")
+
+    def clear(self):
+        """Remove all keys."""
+        raise NotImplementedError("subclass responsibility")
+
+
+class MemoryBackend(CacheBackend):
+    """An in-process LRU cache holding up to ``maxsize`` results.
+
+    ``hits`` and ``misses`` count the lookups.
+    """
+
+    def __init__(self, maxsize=1000):
+        self.cache = LRUCache(maxsize)
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        value = self.cache.get(key)
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    def set(self, key, value):
+        self.cache[key] = value
+
+    def delete(self, key):
+        try:
+            del self.cache[key]
+        except KeyError:
+            pass
+
+    def clear(self):
+        self.cache.clear()
+        self.hits = 0
+        self.misses = 0
+
+
+class SQLiteBackend(CacheBackend):
+    """A cache in an SQLite database file, which can be shared by several
+    processes on the same host.
+
+    Values are pickled.  There is no size limit or expiration; call
+    ``clear()`` or delete the file to empty it.  Requires the ``sqlite3``
+    module (Python 2.5 or later).
+    """
+
+    def __init__(self, path, table="webhelpers_cache"):
+        import sqlite3
+        self._sqlite3 = sqlite3
+        self.path = path
+        self.table = table
+        self._lock = threading.Lock()
+        self._conn = None
+        self._pid = None
+        self._execute(
+            "CREATE TABLE IF NOT EXISTS %s (key TEXT PRIMARY KEY, value BLOB)"
+            % table)
+
+    def _execute(self, sql, params=()):
+        """Execute a statement and return the first row, if any."""
+        self._lock.acquire()
+        try:
+            # Connections can't be shared across a fork, so each process
+            # opens its own.
+            if self._conn is None or self._pid != os.getpid():
+                self._conn = self._sqlite3.connect(self.path,
+                    check_same_thread=False)
+                self._pid = os.getpid()
+            cursor = self._conn.execute(sql, params)
+            row = cursor.fetchone()
+            self._conn.commit()
+            return row
+        finally:
+            self._lock.release()
+
+    def get(self, key):
+        row = self._execute("SELECT value FROM %s WHERE key = ?" % self.table,
+            (key,))
+        if row is None:
+            return None
+        return cPickle.loads(str(row[0]))
+
+    def set(self, key, value):
+        data = self._sqlite3.Binary(cPickle.dumps(value, 2))
+        self._execute("INSERT OR REPLACE INTO %s (key, value) VALUES (?, ?)"
+            % self.table, (key, data))
+
+    def delete(self, key):
+        self._execute("DELETE FROM %s WHERE key = ?" % self.table, (key,))
+
+    def clear(self):
+        self._execute("DELETE FROM %s" % self.table)
@@ -1,15 +1,99 @@
 # -*- encoding: latin-1 -*-
 # Latin-1 encoding needed for countries list.
 """Place names and other constants often used in web forms.
+
+The lists are built the first time they're requested, and the same tuple is
+returned on every call thereafter.  Each list also has a ``PlaceIndex`` for
+looking up names by code and vice versa, and for finding names by prefix
+(e.g., in an autocomplete handler)::
+
+    >>> index = us_state_index()
+    >>> index.name("OR")
+    'Oregon'
+    >>> index.code("oregon")
+    'OR'
+    >>> index.search("new")
+    [('NH', 'New Hampshire'), ('NJ', 'New Jersey'), ('NM', 'New Mexico'), ('NY', 'New York')]
 """
 
+import bisect
+
+_cache = {}
+
+def _build_once(func):
+    """Decorator to call a no-argument function only once.
+
+    The result is saved and returned on all later calls.
+    """
+    def wrapper():
+        try:
+            return _cache[func]
+        except KeyError:
+            result = _cache[func] = func()
+            return result
+    wrapper.__name__ = func.__name__
+    wrapper.__doc__ = func.__doc__
+    return wrapper
+
+
+class PlaceIndex(object):
+    """Lookup tables for a sequence of ``(code, name)`` pairs.
+
+    Lookups by name and prefix searches are case-insensitive.  The indexes
+    are built once in the constructor, so create the index once and keep it
+    (the ``*_index()`` functions in this module do that).
+    """
+
+    def __init__(self, pairs):
+        self.pairs = tuple(pairs)
+        self.by_code = {}
+        self.by_name = {}
+        for code, name in self.pairs:
+            self.by_code[code] = name
+            self.by_name[name.lower()] = code
+        self._sorted = [(name.lower(), i) for i, (code, name) in
+            enumerate(self.pairs)]
+        self._sorted.sort()
+        self._keys = [x[0] for x in self._sorted]
+
+    def name(self, code, default=None):
+        """Return the name for a code, or ``default`` if not found."""
+        return self.by_code.get(code, default)
+
+    def code(self, name, default=None):
+        """Return the code for a name, or ``default`` if not found."""
+        return self.by_name.get(name.lower(), default)
+
+    def search(self, prefix, limit=None):
+        """Return the ``(code, name)`` pairs whose name starts with
+        ``prefix``, in the original order.
+
+        If ``limit`` is given, return at most that many pairs.
+        """
+        prefix = prefix.lower()
+        start = bisect.bisect_left(self._keys, prefix)
+        positions = []
+        for j in xrange(start, len(self._sorted)):
+            key, i = self._sorted[j]
+            if not key.startswith(prefix):
+                break
+            positions.append(i)
+        positions.sort()
+        if limit is not None:
+            positions = positions[:limit]
+        return [self.pairs[i] for i in positions]
+
+
+#### Lists ####
+
+@_build_once
 def uk_counties():
     """\
-    Return a list of UK county names.
+    Return a tuple of UK county names.
     """
     # Based on http://www.gbet.com/AtoZ_counties/
     # Updated 2007-10-24
-    return [x.strip()[2:] for x in """\
+    return tuple([x.strip()[2:] for x in """\
     * Avon
     * Bedfordshire
     * Berkshire
@@ -79,11 +163,11 @@ def uk_counties():
     * West Sussex
     * West Yorkshire
     * Wiltshire
-    * Worcestershire""".split('\n')]
+    * Worcestershire""".split('\n')])
 
-_country_codes = None
+@_build_once
 def country_codes():
-    """Return a list of all country names as tuples. The tuple value is the
+    """Return a tuple of all country names as tuples. The tuple value is the
     country's 2-letter ISO code and its name; e.g., 
     ``("GB", "United Kingdom")``. The countries are in name order.
     
@@ -102,12 +186,7 @@ def country_codes():
     # This might seem a funny implementation but it makes it easier to update
     # next time there is a change
 
-    global _country_codes
-    if _country_codes is not None:
-        return _country_codes
-    else:
-        
-        text_directly_from_iso_website = u"""
+    text_directly_from_iso_website = u"""
 A   	  
 AFGHANISTAN 	AF
 ÅLAND ISLANDS 	AX
@@ -405,18 +484,18 @@ ZIMBABWE 	ZW
                     continue
             p = tuple(p)
             e.append(p)
-    _country_codes = e
-    return _country_codes
+    return tuple(e)
 
+@_build_once
 def us_states():
     """List of USA states.
 
-    Return a list of ``(abbreviation, name)`` for all US states, sorted by name.
+    Return a tuple of ``(abbreviation, name)`` for all US states, sorted by name.
     Includes the District of Columbia.
     """
     # From http://www.usps.com/ncsc/lookups/abbreviations.html
     #Updated 2008-05-01
-    return [
+    return (
         ("AL", "Alabama"),
         ("AK", "Alaska"),
         ("AZ", "Arizona"),
@@ -468,17 +547,18 @@ def us_states():
         ("WV", "West Virginia"),
         ("WI", "Wisconsin"),
         ("WY", "Wyoming"),
-        ]
+        )
 
+@_build_once
 def us_territories():
     """USA postal abbreviations for territories, protectorates, and military.
     
-    The return value is a list of ``(abbreviation, name)`` tuples. The
+    The return value is a tuple of ``(abbreviation, name)`` tuples. The
     locations are sorted by name.
     """
     # From http://www.usps.com/ncsc/lookups/abbreviations.html
     # Updated 2008-05-01
-    return [
+    return (
         ("AS", "American Samoa"),
         ("AA", "Armed Forces Americas"),
         ("AE", "Armed Forces Europe/Canada/Middle East/Africa"),
@@ -490,13 +570,14 @@ def us_territories():
         ("PW", "Palau"),
         ("PR", "Puerto Rico"),
         ("VI", "Virgin Islands"),
-        ]
+        )
     
 
+@_build_once
 def canada_provinces():
     """List of Canadian provinces.
 
-    Return a list of ``(abbreviation, name)`` tuples for all Canadian
+    Return a tuple of ``(abbreviation, name)`` tuples for all Canadian
     provinces and territories, sorted by name.
     """
     # Based on:
@@ -520,4 +601,35 @@ def canada_provinces():
         ("Yukon", "YT"),
         ]
     provinces.sort()
-    return [(x[1], x[0]) for x in provinces]
+    return tuple([(x[1], x[0]) for x in provinces])
+
+
+#### Indexes ####
+
+@_build_once
+def country_index():
+    """Return a ``PlaceIndex`` of ``country_codes()``."""
+    return PlaceIndex(country_codes())
+
+@_build_once
+def us_state_index():
+    """Return a ``PlaceIndex`` of ``us_states()``."""
+    return PlaceIndex(us_states())
+
+@_build_once
+def us_territory_index():
+    """Return a ``PlaceIndex`` of ``us_territories()``."""
+    return PlaceIndex(us_territories())
+
+@_build_once
+def canada_province_index():
+    """Return a ``PlaceIndex`` of ``canada_provinces()``."""
+    return PlaceIndex(canada_provinces())
+
+@_build_once
+def uk_county_index():
+    """Return a ``PlaceIndex`` of ``uk_counties()``.
+
+    The counties have no codes, so the name is used as the code.
+    """
+    return PlaceIndex([(x, x) for x in uk_counties()])
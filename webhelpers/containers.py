@@ -6,6 +6,7 @@ package.
 """
 
 import sys
+import threading
 
 from webhelpers.misc import NotGiven
 
@@ -212,6 +213,129 @@ class UniqueAccumulator(object):
         self.result[key].add(value)
 
 
+class LRUCache(object):
+    """A dict-like container holding at most ``maxsize`` items.
+
+    When the cache is full, adding a new key discards the least recently used
+    item.  Reading or writing a key counts as a use; ``in`` does not.  The
+    cache is safe to share between threads.
+
+        >>> cache = LRUCache(2)
+        >>> cache["a"] = 1
+        >>> cache["b"] = 2
+        >>> cache["a"]
+        1
+        >>> cache["c"] = 3
+        >>> sorted(cache.keys())
+        ['a', 'c']
+    """
+
+    # Each value in ``self._data`` is a link in a circular doubly-linked
+    # list: ``[prev, next, key, value]``.  The root link sits between the
+    # most recently used item (``root[0]``) and the least (``root[1]``).
+
+    def __init__(self, maxsize=128):
+        if maxsize < 1:
+            raise ValueError("maxsize must be at least 1")
+        self.maxsize = maxsize
+        self._lock = threading.Lock()
+        self.clear()
+
+    def clear(self):
+        """Remove all items."""
+        self._lock.acquire()
+        try:
+            self._data = {}
+            root = []
+            root[:] = [root, root, None, None]
+            self._root = root
+        finally:
+            self._lock.release()
+
+    def get(self, key, default=None):
+        """Return the value for ``key``, or ``default`` if it's missing."""
+        self._lock.acquire()
+        try:
+            link = self._data.get(key)
+            if link is None:
+                return default
+            self._touch(link)
+            return link[3]
+        finally:
+            self._lock.release()
+
+    def __getitem__(self, key):
+        self._lock.acquire()
+        try:
+            link = self._data[key]
+            self._touch(link)
+            return link[3]
+        finally:
+            self._lock.release()
+
+    def __setitem__(self, key, value):
+        self._lock.acquire()
+        try:
+            link = self._data.get(key)
+            if link is not None:
+                link[3] = value
+                self._touch(link)
+                return
+            root = self._root
+            if len(self._data) >= self.maxsize:
+                oldest = root[1]
+                oldest[0][1] = oldest[1]
+                oldest[1][0] = oldest[0]
+                del self._data[oldest[2]]
+            last = root[0]
+            link = [last, root, key, value]
+            last[1] = root[0] = self._data[key] = link
+        finally:
+            self._lock.release()
+
+    def __delitem__(self, key):
+        self._lock.acquire()
+        try:
+            link = self._data.pop(key)
+            link[0][1] = link[1]
+            link[1][0] = link[0]
+        finally:
+            self._lock.release()
+
+    def __contains__(self, key):
+        return key in self._data
+
+    def __len__(self):
+        return len(self._data)
+
+    def keys(self):
+        """Return the keys from least to most recently used."""
+        self._lock.acquire()
+        try:
+            keys = []
+            root = self._root
+            link = root[1]
+            while link is not root:
+                keys.append(link[2])
+                link = link[1]
+            return keys
+        finally:
+            self._lock.release()
+
+    def _touch(self, link):
+        """Move a link to the most recently used position.
+
+        The caller must hold the lock.
+        """
+        root = self._root
+        link[0][1] = link[1]
+        link[1][0] = link[0]
+        last = root[0]
+        last[1] = root[0] = link
+        link[0] = last
+        link[1] = root
+
+
 def unique(it):
     """Return a list of unique elements in the iterable, preserving the order.
 
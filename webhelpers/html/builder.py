@@ -104,6 +104,10 @@ The ``HTML`` object has the following methods for tag building:
         If present and true, insert a newline before the first content
         element, between each content element, and at the end of the tag.
 
+    ``_attrs``
+        A ``FrozenAttrs`` object containing constant attributes.  These are
+        merged with the keyword attributes, which take precedence.
+
     Example:
 
     >>> HTML.tag("a", href="http://www.yahoo.com", name=None, 
@@ -127,6 +131,40 @@ The ``HTML`` object has the following methods for tag building:
     >>> HTML.cdata(u"<p>")
     literal(u'<![CDATA[<p>]]>')
 
+``HTML.compile(tag, *attr_names, **attrs)``
+    Precompile a tag shape that will be rendered many times, such as a table
+    cell in a long list.  The keyword args are constant attributes which are
+    sorted and escaped once.  The positional args name the attributes that
+    may vary per call; a keyword arg with the same name as a positional one
+    serves as its default.  The result is a callable taking the same
+    arguments as ``HTML.tag`` (minus the tag name), and its output is
+    identical to the equivalent ``HTML.tag`` call.  ``_closed``, ``_nl``,
+    and ``_attrs`` are fixed at compile time.  Attributes not declared at
+    compile time are still accepted, but fall back to the ordinary (slower)
+    code path.
+
+    >>> td = HTML.compile("td", "id", class_="cell")
+    >>> td("Foo", id="c1")
+    literal(u'<td class="cell" id="c1">Foo</td>')
+
+``HTML.lazy``
+    A builder with the same interface as ``HTML``, but which returns
+    unrendered ``Node`` objects instead of literals.  Nodes satisfy the
+    ``.__html__`` protocol, so they can be used anywhere a literal can.
+    Their ``.iter_chunks()`` method is a generator yielding the markup
+    piece by piece, which avoids building the entire page in memory; a WSGI
+    application can encode and return the chunks directly.  The content may
+    be a generator, in which case it's consumed during rendering and the
+    node can only be rendered once.
+
+    >>> rows = (HTML.lazy.tr(HTML.lazy.td(i)) for i in range(2))
+    >>> table = HTML.lazy.table(c=rows)
+    >>> chunks = table.iter_chunks()
+    >>> chunks.next()
+    u'<table>'
+    >>> u"".join(chunks)
+    u'<tr><td>0</td></tr><tr><td>1</td></tr></table>'
+
 About XHTML and HTML
 --------------------
 
@@ -284,6 +322,112 @@ class HTMLBuilder(object):
         s = "".join(parts)
         return literal(s)
 
+    def compile(self, tag, *attr_names, **attrs):
+        """Precompile a tag; see ``CompiledTag``."""
+        return CompiledTag(tag, *attr_names, **attrs)
+
+class UnfinishedNode(UnfinishedTag):
+
+    """Represents an unfinished or empty lazy tag."""
+
+    def __call__(self, *args, **kw):
+        """Create the node with the arguments passed in."""
+        return make_node(self._tag, *args, **kw)
+
+
+class LazyHTMLBuilder(HTMLBuilder):
+
+    """HTML object which builds ``Node`` trees rather than literals."""
+
+    def __getattr__(self, attr):
+        """Generate the node for the given attribute name."""
+        if attr.startswith('_'):
+            raise AttributeError
+        result = self.__dict__[attr] = UnfinishedNode(attr.lower())
+        return result
+
+    def __call__(self, *args):
+        """Return a node which escapes and concatenates the args."""
+        return Node(None, args)
+
+    def tag(self, tag, *args, **kw):
+        return make_node(tag, *args, **kw)
+
+
+class Node(object):
+
+    """A tag whose markup is generated on demand.
+
+    ``tag`` is the tag name, or None for a bare sequence of content.
+    ``content`` is an iterable of strings, literals, and other nodes.
+    ``attrs_str`` is the output of ``format_attrs``.  Use ``HTML.lazy`` to
+    create nodes rather than calling this constructor directly.
+    """
+
+    __slots__ = ("tag", "content", "attrs_str", "closed", "nl")
+
+    def __init__(self, tag, content, attrs_str=u"", closed=True, nl=False):
+        self.tag = tag
+        self.content = content
+        self.attrs_str = attrs_str
+        self.closed = closed
+        self.nl = nl
+
+    def iter_chunks(self):
+        """Generate the HTML for this node as a series of strings.
+
+        Every chunk is already escaped.  Joining them produces the same
+        markup as the equivalent non-lazy ``HTML`` call.
+        """
+        tag = self.tag
+        nl = self.nl
+        if tag is None:
+            for chunk in iter_chunks(*self.content):
+                yield chunk
+            return
+        if not self.content and tag in empty_tags and self.closed:
+            yield u"<%s%s />" % (tag, self.attrs_str)
+        else:
+            yield u"<%s%s>" % (tag, self.attrs_str)
+            for x in self.content:
+                if nl:
+                    yield u"\n"
+                if hasattr(x, "iter_chunks"):
+                    for chunk in x.iter_chunks():
+                        yield chunk
+                else:
+                    yield escape(x)
+            if self.closed:
+                if nl:
+                    yield u"\n"
+                yield u"</%s>" % tag
+        if nl:
+            yield u"\n"
+
+    def __html__(self):
+        """Render the node and return it as a literal."""
+        return literal(u"".join(self.iter_chunks()))
+
+    __unicode__ = __html__
+
+    def __repr__(self):
+        return "<Node %r>" % self.tag
+
+
+def iter_chunks(*args):
+    """Generate the escaped HTML for the args one chunk at a time.
+
+    ``Node`` args are rendered incrementally via their ``.iter_chunks()``
+    method; anything else is escaped in one piece.
+    """
+    for x in args:
+        if hasattr(x, "iter_chunks"):
+            for chunk in x.iter_chunks():
+                yield chunk
+        else:
+            yield escape(x)
+
+
 def _attr_decode(v):
     """Parse out attributes that begin with '_'."""
     if v.endswith('_'):
@@ -292,6 +436,82 @@ def _attr_decode(v):
         return v
 
 
+class CompiledTag(object):
+
+    """A tag whose attributes are sorted and escaped in advance.
+
+    Keyword args to the constructor are constant attributes.  Positional args
+    name the attributes which vary from call to call; these may also be given
+    a default value as a keyword arg.  Calling the object produces the same
+    output as ``make_tag`` would with the merged attributes.
+    """
+
+    def __init__(self, tag, *attr_names, **attrs):
+        self._tag = tag
+        self._closed = attrs.pop("_closed", True)
+        self._nl = attrs.pop("_nl", False)
+        frozen = attrs.pop("_attrs", None)
+        if frozen is not None:
+            attrs = dict(frozen.items(), **attrs)
+        self._attrs = attrs
+        self._names = frozenset(attr_names)
+        # Each skeleton item is ``(attr, chunk, default)``.  ``attr`` is None
+        # for a constant attribute, in which case ``chunk`` is its complete
+        # rendering; otherwise ``chunk`` is the text before the value.
+        skeleton = []
+        for attr in sorted(self._names.union(attrs)):
+            value = attrs.get(attr)
+            if attr in self._names:
+                prefix = u' %s="' % _attr_decode(attr)
+                skeleton.append((attr, prefix, value))
+            elif value is not None:
+                chunk = u' %s="%s"' % (_attr_decode(attr), escape(value))
+                if skeleton and skeleton[-1][0] is None:
+                    chunk = skeleton.pop()[1] + chunk
+                skeleton.append((None, chunk, None))
+        self._skeleton = skeleton
+
+    def __call__(self, *args, **kw):
+        """Create the tag with the arguments passed in."""
+        if kw.has_key("c"):
+            assert not args, "The special 'c' keyword argument cannot be "\
+"used in conjunction with non-keyword arguments"
+            args = kw.pop("c")
+        if not self._names.issuperset(kw):
+            # Other attributes, or ``_closed``/``_nl`` overriding ours.
+            attrs = self._attrs.copy()
+            attrs["_closed"] = self._closed
+            attrs["_nl"] = self._nl
+            attrs.update(kw)
+            return make_tag(self._tag, c=args, **attrs)
+        tag = self._tag
+        parts = ["<", tag]
+        for attr, chunk, default in self._skeleton:
+            if attr is None:
+                parts.append(chunk)
+                continue
+            value = kw.get(attr, default)
+            if value is not None:
+                parts.extend((chunk, escape(value), u'"'))
+        closed = self._closed
+        if not args and tag in empty_tags and closed:
+            parts.append(" />")
+            html = "".join(parts)
+        else:
+            parts.append(">")
+            chunks = ["".join(parts)]
+            chunks.extend(escape(x) for x in args)
+            if closed:
+                chunks.append("</%s>" % tag)
+            if self._nl:
+                html = "\n".join(chunks)
+            else:
+                html = "".join(chunks)
+        if self._nl:
+            html += "\n"
+        return literal(html)
+
+
 def make_tag(tag, *args, **kw):
     if kw.has_key("c"):
         assert not args, "The special 'c' keyword argument cannot be used "\
@@ -316,12 +536,80 @@ def make_tag(tag, *args, **kw):
         html += "\n"
     return literal(html)
 
-def format_attrs(**attrs):
+def make_node(tag, *args, **kw):
+    """Same as ``make_tag`` but return an unrendered ``Node``."""
+    if kw.has_key("c"):
+        assert not args, "The special 'c' keyword argument cannot be used "\
+"in conjunction with non-keyword arguments"
+        args = kw.pop("c")
+    closed = kw.pop("_closed", True)
+    nl = kw.pop("_nl", False)
+    return Node(tag, args, format_attrs(**kw), closed, nl)
+
+class FrozenAttrs(object):
+
+    """An immutable set of tag attributes which is formatted only once.
+
+    Use this for attributes which are the same every time a tag is built,
+    and pass it to ``HTML.tag`` (or ``format_attrs``) as the ``_attrs``
+    argument.  Any other attributes are merged in, and override the frozen
+    ones of the same name.  Instances are hashable if the values are.
+
+    >>> link_attrs = FrozenAttrs(class_="pager_link")
+    >>> HTML.a("2", href="?page=2", _attrs=link_attrs)
+    literal(u'<a class="pager_link" href="?page=2">2</a>')
+    """
+
+    __slots__ = ("_items", "_chunks", "_formatted")
+
+    def __init__(self, **attrs):
+        self._items = tuple(sorted(attrs.iteritems()))
+        self._chunks = [(attr, u' %s="%s"' % (_attr_decode(attr), escape(value)))
+            for attr, value in self._items
+            if value is not None]
+        self._formatted = literal("".join([x[1] for x in self._chunks]))
+
+    def format(self, **attrs):
+        """Return the formatted attributes merged with ``attrs``."""
+        if not attrs:
+            return self._formatted
+        chunks = [x for x in self._chunks if x[0] not in attrs]
+        for attr, value in attrs.iteritems():
+            if value is not None:
+                chunks.append(
+                    (attr, u' %s="%s"' % (_attr_decode(attr), escape(value))))
+        chunks.sort()
+        return literal("".join([x[1] for x in chunks]))
+
+    def items(self):
+        """Return the attributes as a sorted list of pairs."""
+        return list(self._items)
+
+    def __eq__(self, other):
+        if not isinstance(other, FrozenAttrs):
+            return NotImplemented
+        return self._items == other._items
+
+    def __ne__(self, other):
+        if not isinstance(other, FrozenAttrs):
+            return NotImplemented
+        return self._items != other._items
+
+    def __hash__(self):
+        return hash(self._items)
+
+    def __repr__(self):
+        args = ", ".join(["%s=%r" % x for x in self._items])
+        return "FrozenAttrs(%s)" % args
+
+
+def format_attrs(_attrs=None, **attrs):
     """Format HTML attributes into a string of ' key="value"' pairs which
     can be inserted into an HTML tag.
 
     The attributes are sorted alphabetically.  If any value is None, the entire
-    attribute is suppressed.
+    attribute is suppressed.  If ``_attrs`` is a ``FrozenAttrs``, its
+    preformatted attributes are merged with the others.
 
     Usage:
     >>> format_attrs(p=2, q=3)
@@ -330,7 +618,11 @@ def format_attrs(**attrs):
     literal(u' p="2"')
     >>> format_attrs(p=None)
     literal(u'')
+    >>> format_attrs(FrozenAttrs(p=2, q=3), q=None, r=4)
+    literal(u' p="2" r="4"')
     """
+    if _attrs is not None:
+        return _attrs.format(**attrs)
     strings = [u' %s="%s"' % (_attr_decode(attr), escape(value))
         for attr, value in sorted(attrs.iteritems())
         if value is not None]
@@ -355,6 +647,7 @@ empty_tags = set(["area", "base", "basefont", "br", "col", "frame", "hr",
     "img", "input", "isindex", "link", "meta", "param"])
 
 HTML = HTMLBuilder()
+HTML.lazy = LazyHTMLBuilder()
 
 # Constants depending on ``literal()`` and/or ``HTML``.
 NL = literal(u"\n")
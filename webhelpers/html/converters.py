@@ -3,11 +3,14 @@
 """
 import re
 
+from webhelpers.cache import cached
 from webhelpers.html import HTML, escape, literal, lit_sub
-import webhelpers.textile as textile
+from webhelpers.misc import LazyModule
 
-# render() and sanitize() are imported from the private module 'render'.
-from webhelpers.html.render import render, sanitize
+# These modules are large, so they're imported only when needed.
+textile = LazyModule("webhelpers.textile")
+# render() and sanitize() are implemented in the private module 'render'.
+_render = LazyModule("webhelpers.html.render")
 
 __all__ = [
     "format_paragraphs",
@@ -22,6 +25,7 @@ _universal_newline_rx = re.compile(R"\r\n|\n|\r")  # All types of newline.
 _paragraph_rx = re.compile(R"\n{2,}")  # Paragraph break: 2 or more newlines.
 br = HTML.br() + "\n"
 
+@cached()
 def markdown(text, markdown=None, **kwargs):
     """Format the text to HTML with Markdown formatting.
 
@@ -43,6 +47,8 @@ def markdown(text, markdown=None, **kwargs):
     If your source text is untrusted and may contain malicious HTML markup,
     pass ``safe_mode="escape"`` to escape it, ``safe_mode="replace"`` to
     replace it with a scolding message, or ``safe_mode="remove"`` to strip it.
+
+    The result is cached if a ``webhelpers.cache`` backend is set.
     """
     if not markdown:
         markdown = _get_markdown_module()
@@ -55,6 +61,7 @@ def _get_markdown_module():
         import webhelpers.markdown as markdown
     return markdown
 
+@cached()
 def textilize(text, sanitize=False):
     """Format the text to HTML with Textile formatting.
     
@@ -63,11 +70,20 @@ def textilize(text, sanitize=False):
     
     Additionally, the output can be sanitized which will fix tags like 
     <img />,  <br /> and <hr /> for proper XHTML output.
-    
+
+    The result is cached if a ``webhelpers.cache`` backend is set.
     """
     texer = textile.Textiler(text)
     return literal(texer.process(sanitize=sanitize))
 
+def render(html, width=70):
+    """Render HTML as formatted text; see ``webhelpers.html.render``."""
+    return _render.render(html, width)
+
+def sanitize(html):
+    """Strip all HTML tags; see ``webhelpers.html.render``."""
+    return _render.sanitize(html)
+
 def nl2br(text):
     """Insert a <br /> before each newline.
     """
@@ -10,7 +10,23 @@ native English speaker who uses the module to volunteer to rewrite it.
 This module is written and maintained by Ergo^.
 """
 
-from webhelpers.html.builder import HTML, literal
+import array
+import copy
+import itertools
+import operator
+import re
+
+from webhelpers.html.builder import HTML, literal, escape, FrozenAttrs
+from webhelpers.number import format_numbers
+
+_HEADER_ATTRS = FrozenAttrs(class_="header")
+_MARKER_ATTRS = FrozenAttrs(class_="marker")
+
+_COLUMN_PLACEHOLDER = "__webhelpers_grid_column__"
+_DIRECTION_PLACEHOLDER = "__webhelpers_grid_direction__"
+# Values which URL generators don't quote, so they can be substituted into a
+# URL template.
+_url_safe_rx = re.compile(r"^[A-Za-z0-9_.-]+$")
 
 class Grid(object):
     """
@@ -80,6 +96,10 @@ class Grid(object):
     You can customize the grids look and behavior by overloading grids instance
     render functions::
     
+        grid.column_getter(self, column_name)
+        returns a function that gets the value of a column from a record,
+        by default record[column_name]
+        
         grid.default_column_format(self, column_number, i, record, column_name)
         by default generates markup like:
         <td class="cNO">VALUE</td>
@@ -112,7 +132,13 @@ class Grid(object):
         grid.numbered_column_format(self, column_number, i, record)
         by default generates markup like:
         <td class="cNO">RECORD_NO</td>
+    
+    If the records are in memory, the grid can sort them itself by the
+    ordering column: set ``grid.sort_items = True``, or call
+    ``sort_itemlist()``.
     """
+    sort_items = False
+    
     def __init__(self, itemlist, columns, column_labels=None,
                   column_formats=None, start_number=1,
                  order_column=None, order_direction=None, request=None,
@@ -164,39 +190,242 @@ class Grid(object):
         return HTML(*header_columns)
     
     def make_columns(self, i, record):
-        columns = []        
-        for col_num, column in enumerate(self.columns):
-            if column in self.column_formats:
-                r = self.column_formats[column](col_num + 1,
-                                                self. calc_row_no(i, column),
-                                                record)
+        return self._render_cells(self.prepare_columns(), i, record)
+    
+    def prepare_columns(self):
+        """ resolves how to render each column, once per render of the grid.
+        
+        Returns a list with a function for each column, which takes the
+        record index (starting at 0) and the record, and returns the cell
+        markup. Formatters in ``column_formats`` and overridden
+        ``default_column_format`` and ``calc_row_no`` methods are called
+        for each cell, as usual. Otherwise the cell is rendered from a
+        prebuilt ``<td>`` template, the value from ``column_getter``, and
+        one escape.
+        """
+        plain_row_no = _is_method(self.calc_row_no, Grid.calc_row_no)
+        plain_format = _is_method(self.default_column_format,
+                                  Grid.default_column_format)
+        return [self._prepare_cell(col_num + 1, column, escape, plain_row_no,
+                                   plain_format)
+                for col_num, column in enumerate(self.columns)]
+    
+    def _prepare_cell(self, column_number, column, escape, plain_row_no,
+                      plain_format):
+        """ returns the function rendering a column's cells for
+        ``prepare_columns`` """
+        if plain_row_no:
+            start = self.start_number
+            if self.order_dir == 'dsc' and self.order_column == column:
+                step = -1
             else:
-                r = self.default_column_format(col_num + 1,
-                                               self.calc_row_no(i, column),
-                                               record, column)
-            columns.append(r)
-        return HTML(*columns)
+                step = 1
+            def row_no(i):
+                return start + step * i
+        else:
+            calc_row_no = self.calc_row_no
+            def row_no(i):
+                return calc_row_no(i, column)
+        template = u'<td class="c%s">%%s</td>' % column_number
+        formatter = self.column_formats.get(column)
+        if formatter is not None:
+            if _is_method(formatter, Grid.numbered_column_format) and \
+                getattr(formatter, "im_self", None) is self:
+                def cell(i, record):
+                    return template % escape(row_no(i))
+            else:
+                def cell(i, record):
+                    return escape(formatter(column_number, row_no(i), record))
+        elif plain_format:
+            getter = self.column_getter(column)
+            def cell(i, record):
+                return template % escape(getter(record))
+        else:
+            column_format = self.default_column_format
+            def cell(i, record):
+                return escape(column_format(column_number, row_no(i), record,
+                                            column))
+        return cell
     
-    def __html__(self):
-        """ renders the grid """
-        records = []
+    def _render_cells(self, cells, i, record):
+        return literal(u"".join([cell(i, record) for cell in cells]))
+    
+    def iter_html(self):
+        """ renders the grid incrementally: yields the header record and then
+        each record as it's rendered.
+        
+        ``itemlist`` is iterated only once, as the records are rendered, so
+        it can be a generator or a database cursor. With a streaming
+        response, only one record at a time needs to be in memory::
+        
+            return Response(app_iter=(unicode(r) for r in grid.iter_html()))
+        """
         #first render headers record
         headers = self.make_headers()
-        r = self.default_header_record_format(headers)
-        records.append(r)
+        yield self.default_header_record_format(headers)
+        if self.sort_items:
+            self.sort_itemlist()
         # now lets render the actual item grid
-        for i, record in enumerate(self.itemlist):
-            columns = self.make_columns(i, record)
+        for row in self._iter_rows(self.itemlist):
+            yield row
+    
+    def _iter_rows(self, records, offset=0):
+        """ yields the rendered records; ``offset`` is the index of the
+        first one in ``itemlist`` """
+        # resolve the column formats once, unless make_columns is overridden
+        make_columns = self.make_columns
+        if _is_method(make_columns, Grid.make_columns):
+            cells = self.prepare_columns()
+            render_cells = self._render_cells
+            make_columns = lambda i, record: render_cells(cells, i, record)
+        for i, record in enumerate(records):
+            i += offset
+            columns = make_columns(i, record)
             if hasattr(self, 'custom_record_format'):
-                r = self.custom_record_format(i + 1, record, columns)
+                yield self.custom_record_format(i + 1, record, columns)
             else:
-                r = self.default_record_format(i + 1, record, columns)
-            records.append(r)
-        return HTML(*records)
+                yield self.default_record_format(i + 1, record, columns)
+    
+    def __html__(self):
+        """ renders the grid """
+        return HTML(*self.iter_html())
+    
+    def render_parallel(self, processes=None, chunksize=1000):
+        """ renders the grid like ``__html__``, but renders the records in a
+        ``multiprocessing.Pool`` of ``processes`` processes (by default, one
+        per CPU), ``chunksize`` records at a time.
+        
+        The header is rendered in the calling process and the chunks are
+        joined in order, so the output is the same as ``__html__``, with
+        the same row numbers and odd/even classes. It's worthwhile only for
+        very large grids, as the grid (without ``itemlist``, ``request``
+        and ``url_generator``) and the records are pickled to the worker
+        processes. The records, the grid's class, and the functions in
+        ``column_formats`` must be picklable, so lambdas won't do.
+        """
+        import multiprocessing
+        header = self.default_header_record_format(self.make_headers())
+        if self.sort_items:
+            self.sort_itemlist()
+        worker = copy.copy(self)
+        worker.itemlist = worker.request = worker.url_generator = None
+        def chunks():
+            offset = 0
+            for chunk in self._chunks(chunksize):
+                yield worker, offset, chunk
+                offset += len(chunk)
+        pool = multiprocessing.Pool(processes)
+        try:
+            rows = list(pool.imap(_render_rows, chunks()))
+        finally:
+            pool.terminate()
+            pool.join()
+        rows.insert(0, header)
+        return literal(u"".join(rows))
+    
+    def _chunks(self, chunksize):
+        """ yields ``itemlist`` in chunks of ``chunksize`` records for
+        ``render_parallel`` """
+        records = iter(self.itemlist)
+        while True:
+            chunk = list(itertools.islice(records, chunksize))
+            if not chunk:
+                break
+            yield chunk
+    
+    def __getstate__(self):
+        # The default numbered column format is a bound method, which can't
+        # be pickled; __setstate__ binds it again. The sort and header URL
+        # caches are left out.
+        state = self.__dict__.copy()
+        state.pop("_sort_cache", None)
+        state.pop("_header_url_templates", None)
+        formats = state["column_formats"] = self.column_formats.copy()
+        numbered = formats.get("_numbered")
+        if _is_method(numbered, Grid.numbered_column_format) and \
+            numbered.im_self is self:
+            del formats["_numbered"]
+        return state
+    
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        if "_numbered" not in self.column_formats:
+            self.column_formats["_numbered"] = self.numbered_column_format
     
     def __str__(self):
         return self.__html__()
 
+    def sort_itemlist(self, column=None, direction=None):
+        """ sorts ``itemlist`` in memory by ``column``, by default
+        ``order_column``; in descending order if ``direction`` (by default
+        ``order_dir``) is "dsc". Does nothing if the column is None or
+        ``_numbered``.
+        
+        ``itemlist`` is replaced by a sorted list; the original sequence isn't
+        changed. Each record's value is got once, with ``column_getter``,
+        and then the records are sorted by the values. The values are kept
+        for as long as ``itemlist`` is the list sorted last, so sorting the
+        same records again by a column sorted by before doesn't get them
+        again. So if the records are changed in place, set ``itemlist`` to
+        a new list of them (e.g. ``grid.itemlist = list(grid.itemlist)``)
+        before sorting again.
+        
+        If ``sort_items`` is true, ``iter_html`` calls this after rendering
+        the headers, when ``generate_header_link`` may have set the order
+        from the request.
+        """
+        if column is None:
+            column = self.order_column
+        if direction is None:
+            direction = self.order_dir
+        if column is None or column == "_numbered":
+            return
+        cache = getattr(self, "_sort_cache", None)
+        if cache is None or cache[0] is not self.itemlist:
+            # Sort the records from scratch
+            cache = (None, list(self.itemlist), {})
+        records, keys = cache[1:]
+        if column not in keys:
+            getter = self.column_getter(column)
+            keys[column] = [getter(record) for record in records]
+        order = sorted(xrange(len(records)), key=keys[column].__getitem__,
+                       reverse=(direction == "dsc"))
+        self.itemlist = [records[i] for i in order]
+        self._sort_cache = (self.itemlist, records, keys)
+    
+    def header_url(self, column, order_dir, url_generator, params):
+        """ returns the URL of a header link:
+        ``url_generator(order_col=column, order_dir=order_dir, **params)``.
+        
+        The URLs for each ``params`` and set of columns are made from one URL
+        template, generated with placeholders as the column and direction,
+        by substituting the column and direction into it. If that doesn't
+        give the same URL as the generator, or a column name would need
+        quoting in a URL, the URL is generated.
+        """
+        if _url_safe_rx.match(column) is None or \
+            _url_safe_rx.match(order_dir) is None:
+            return url_generator(order_col=column, order_dir=order_dir,
+                                 **params)
+        templates = self.__dict__.setdefault("_header_url_templates", {})
+        key = (tuple(sorted(params.items())), tuple(self.columns))
+        try:
+            entry = templates.get(key)
+        except TypeError:
+            # unhashable parameter values
+            return url_generator(order_col=column, order_dir=order_dir,
+                                 **params)
+        if entry is None or entry[0] != url_generator:
+            template = _make_header_url_template(column, order_dir,
+                                                 url_generator, params)
+            entry = templates[key] = (url_generator, template)
+        template = entry[1]
+        if template is None:
+            return url_generator(order_col=column, order_dir=order_dir,
+                                 **params)
+        return template.replace(_COLUMN_PLACEHOLDER, column).replace(
+            _DIRECTION_PLACEHOLDER, order_dir)
+
     def generate_header_link(self, column_number, column, label_text):
         """ This handles generation of link and then decides to call
         ``self.default_header_ordered_column_format`` 
@@ -208,7 +437,7 @@ class Grid(object):
         ordering here, whole operation consists of setting
         self.order_column and self.order_dir to their CURRENT values,
         and generating new urls for state that header should set set after its
-        clicked
+        clicked (``header_url`` generates them from a single URL template)
         
         (additional kw are passed to url gen. - like for webhelpers.paginate)
         example URL generation code below::
@@ -241,9 +470,14 @@ class Grid(object):
 
     #### Default HTML tag formats ####
 
+    def column_getter(self, column_name):
+        """ returns a function which gets a column's value from a record """
+        return operator.itemgetter(column_name)
+
     def default_column_format(self, column_number, i, record, column_name):
         class_name = "c%s" % (column_number)
-        return HTML.tag("td", record[column_name], class_=class_name)
+        value = self.column_getter(column_name)(record)
+        return HTML.tag("td", value, class_=class_name)
     
     def numbered_column_format(self, column_number, i, record):
         class_name = "c%s" % (column_number)
@@ -257,11 +491,12 @@ class Grid(object):
         return HTML.tag("tr", columns, class_=class_name)
 
     def default_header_record_format(self, headers):
-        return HTML.tag("tr", headers, class_="header")
+        return HTML.tag("tr", headers, _attrs=_HEADER_ATTRS)
 
     def default_header_ordered_column_format(self, column_number, column_name,
                                              header_label):
-        header_label = HTML(header_label, HTML.tag("span", class_="marker"))
+        header_label = HTML(header_label,
+                HTML.tag("span", _attrs=_MARKER_ATTRS))
         if column_name == "_numbered":
             column_name = "numbered"
         class_name = "c%s ordering %s %s" % (column_number, self.order_dir, column_name)
@@ -275,7 +510,8 @@ class Grid(object):
             class_name = "c%s %s" % (column_number, column_name)
             return HTML.tag("td", header_label, class_=class_name)
         else:
-            header_label = HTML(header_label, HTML.tag("span", class_="marker"))
+            header_label = HTML(header_label,
+                HTML.tag("span", _attrs=_MARKER_ATTRS))
             class_name = "c%s ordering %s" % (column_number, column_name)
             return HTML.tag("td", header_label, class_=class_name)
 
@@ -287,9 +523,8 @@ class ObjectGrid(Grid):
     uses attribute access to retrieve the column values. It works well with
     SQLAlchemy ORM instances.
     """
-    def default_column_format(self, column_number, i, record, column_name):
-        class_name = "c%s" % (column_number)
-        return HTML.tag("td", getattr(record, column_name), class_=class_name)
+    def column_getter(self, column_name):
+        return operator.attrgetter(column_name)
 
 class ListGrid(Grid):
     """ A grid class for a sequence of lists.
@@ -326,6 +561,262 @@ class ListGrid(Grid):
             super_labels = dict(zip(super_columns, column_labels))
         Grid.__init__(self, itemlist, super_columns, super_labels, *args, **kw)
   
-    def default_column_format(self, column_number, i, record, column_name):
-        class_name = "c%s" % (column_number)
-        return HTML.tag("td", record[int(column_name)], class_=class_name)
+    def column_getter(self, column_name):
+        return operator.itemgetter(int(column_name))
+
+
+class ColumnarGrid(Grid):
+    """ A grid class for columnar data.
+    
+    ``data`` is a mapping of column names to sequences of values, all of the
+    same length, like lists, ``array.array``\s, or NumPy arrays::
+    
+        grid = ColumnarGrid({"day": days, "visits": visits},
+                            ["_numbered", "day", "visits"])
+    
+    The grid renders ``blocksize`` rows at a time, a column at a time: each
+    column's values in the block are sliced out, formatted, and made into
+    cells together, and then the cells of the rows are joined. No dict is
+    built for a row; the records passed to the functions in
+    ``column_formats`` and to ``default_record_format`` are small views
+    supporting ``record[column_name]``.
+    
+    The columns named in ``number_columns`` are formatted with thousands
+    separators by ``webhelpers.number.format_numbers()``, in one pass per
+    column and block, using ``thousands`` and ``decimal``. By default these
+    are the columns which are ``array.array``\s of numbers or NumPy arrays of
+    ints or floats. Pass an empty list to show the numbers as they are.
+    """
+    blocksize = 1000
+    
+    def __init__(self, data, columns, column_labels=None, column_formats=None,
+                 number_columns=None, thousands=",", decimal=".", **kw):
+        Grid.__init__(self, _ColumnarRows(data), columns, column_labels,
+                      column_formats, **kw)
+        if number_columns is None:
+            number_columns = [k for k, v in data.iteritems()
+                              if _is_number_array(v)]
+        self.number_columns = number_columns
+        self.thousands = thousands
+        self.decimal = decimal
+    
+    def _iter_rows(self, records, offset=0):
+        if not isinstance(records, _ColumnarRows) or \
+            not _is_method(self.make_columns, Grid.make_columns):
+            for row in Grid._iter_rows(self, records, offset):
+                yield row
+            return
+        column_blocks = self.prepare_column_blocks()
+        record_format = getattr(self, "custom_record_format",
+                                self.default_record_format)
+        length = len(records)
+        for start in xrange(0, length, self.blocksize):
+            block = records[start:start + self.blocksize]
+            rows = list(block)
+            cells = [f(block, offset + start, rows) for f in column_blocks]
+            i = offset + start
+            for record, row_cells in itertools.izip(rows,
+                                                    itertools.izip(*cells)):
+                i += 1
+                columns = literal(u"".join(row_cells))
+                yield record_format(i, record, columns)
+    
+    def prepare_column_blocks(self):
+        """ resolves how to render each column, once per render of the grid.
+        
+        Returns a list with a function for each column, which takes a block
+        of rows (a slice of ``itemlist``), the index of its first row, and
+        its records, and returns the cells of the column in the block. The
+        values of plain columns are taken from the block's sequences, and
+        numbers are formatted together; other columns use the functions from
+        ``prepare_columns``.
+        """
+        plain_row_no = _is_method(self.calc_row_no, Grid.calc_row_no)
+        plain_format = _is_method(self.default_column_format,
+                                  Grid.default_column_format)
+        cells = self.prepare_columns()
+        blocks = []
+        for col_num, column in enumerate(self.columns):
+            formatter = self.column_formats.get(column)
+            template = u'<td class="c%s">%%s</td>' % (col_num + 1)
+            if formatter is None and plain_format:
+                blocks.append(self._block_values(column, template, escape))
+            elif plain_row_no and \
+                _is_method(formatter, Grid.numbered_column_format) and \
+                getattr(formatter, "im_self", None) is self:
+                blocks.append(self._block_numbers(column, template))
+            else:
+                blocks.append(self._block_cells(cells[col_num]))
+        return blocks
+    
+    def _block_values(self, column, template, escape):
+        """ returns the function rendering a column of values from the data
+        for ``prepare_column_blocks`` """
+        thousands = self.thousands
+        decimal = self.decimal
+        if column not in self.number_columns:
+            def cells(block, i, records):
+                return [template % escape(v) for v in block.column(column)]
+        elif escape(thousands + decimal) == thousands + decimal:
+            # Formatted numbers needn't be escaped.
+            def cells(block, i, records):
+                values = format_numbers(block.column(column), thousands,
+                                        decimal)
+                return [template % v for v in values]
+        else:
+            def cells(block, i, records):
+                values = format_numbers(block.column(column), thousands,
+                                        decimal)
+                return [template % escape(v) for v in values]
+        return cells
+    
+    def _block_numbers(self, column, template):
+        """ returns the function rendering a column of row numbers for
+        ``prepare_column_blocks`` """
+        start = self.start_number
+        if self.order_dir == 'dsc' and self.order_column == column:
+            step = -1
+        else:
+            step = 1
+        def cells(block, i, records):
+            first = start + step * i
+            return [template % n for n in
+                    xrange(first, first + step * len(records), step)]
+        return cells
+    
+    def _block_cells(self, cell):
+        """ returns the function rendering a column cell by cell for
+        ``prepare_column_blocks`` """
+        def cells(block, i, records):
+            return [cell(i + j, record) for j, record in enumerate(records)]
+        return cells
+    
+    def _chunks(self, chunksize):
+        records = self.itemlist
+        for start in xrange(0, len(records), chunksize):
+            yield records[start:start + chunksize]
+    
+    def sort_itemlist(self, column=None, direction=None):
+        """ sorts the rows like ``Grid.sort_itemlist``, by reordering each
+        column. ``array.array`` and NumPy columns stay so. """
+        if column is None:
+            column = self.order_column
+        if direction is None:
+            direction = self.order_dir
+        if column is None or column == "_numbered":
+            return
+        cache = getattr(self, "_sort_cache", None)
+        if cache is None or cache[0] is not self.itemlist:
+            cache = (None, self.itemlist, {})
+        rows, keys = cache[1:]
+        if column not in keys:
+            keys[column] = rows.column(column)
+        order = sorted(xrange(len(rows)), key=keys[column].__getitem__,
+                       reverse=(direction == "dsc"))
+        data = dict([(k, _take(v, order)) for k, v in rows.data.iteritems()])
+        self.itemlist = _ColumnarRows(data)
+        self._sort_cache = (self.itemlist, rows, keys)
+
+
+class _ColumnarRows(object):
+    """ the rows of a ``ColumnarGrid``, as a sequence of ``_ColumnarRow``
+    views. Slicing slices each column. """
+    def __init__(self, data):
+        lengths = dict([(len(v), k) for k, v in data.iteritems()])
+        if len(lengths) > 1:
+            raise ValueError("columns have different lengths: %s" %
+                             ", ".join(["%s=%d" % (k, n) for n, k in
+                                        sorted(lengths.items())]))
+        self.data = data
+        self.length = (lengths.keys() or [0])[0]
+    
+    def __len__(self):
+        return self.length
+    
+    def __iter__(self):
+        data = self.data
+        for i in xrange(self.length):
+            yield _ColumnarRow(data, i)
+    
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return _ColumnarRows(dict([(k, v[index])
+                                       for k, v in self.data.iteritems()]))
+        if index < 0:
+            index += self.length
+        if not 0 <= index < self.length:
+            raise IndexError("row index out of range")
+        return _ColumnarRow(self.data, index)
+    
+    def column(self, name):
+        """ returns a column's values as a list """
+        values = self.data[name]
+        if hasattr(values, "tolist"):
+            # array.array or NumPy array: convert to Python values at once
+            return values.tolist()
+        return list(values)
+
+
+class _ColumnarRow(object):
+    """ a row of a ``ColumnarGrid``: a view of its values in the columns """
+    __slots__ = ("data", "index")
+    
+    def __init__(self, data, index):
+        self.data = data
+        self.index = index
+    
+    def __getitem__(self, column_name):
+        return self.data[column_name][self.index]
+    
+    def __repr__(self):
+        return "<_ColumnarRow %d>" % self.index
+
+
+def _take(values, order):
+    """ returns the values at the indexes in ``order``, in a sequence of the
+    same kind if it's an ``array.array`` or NumPy array """
+    if isinstance(values, array.array):
+        return array.array(values.typecode, [values[i] for i in order])
+    if hasattr(values, "take"):
+        return values.take(order)
+    return [values[i] for i in order]
+
+
+def _is_number_array(values):
+    """ does ``values`` hold only numbers, by its type? """
+    if isinstance(values, array.array):
+        return values.typecode not in "cu"
+    kind = getattr(getattr(values, "dtype", None), "kind", None)
+    return kind in ("i", "u", "f")
+
+
+def _make_header_url_template(column, order_dir, url_generator, params):
+    """ returns the URL template for ``Grid.header_url``, or None if the
+    generator can't be templated. ``column`` and ``order_dir`` are used to
+    check the template. """
+    try:
+        template = url_generator(order_col=_COLUMN_PLACEHOLDER,
+                                 order_dir=_DIRECTION_PLACEHOLDER, **params)
+    except Exception:
+        # The generator can't handle a placeholder, e.g. the route requires
+        # one of the column names.
+        return None
+    if template.count(_COLUMN_PLACEHOLDER) != 1 or \
+        template.count(_DIRECTION_PLACEHOLDER) != 1:
+        return None
+    url = template.replace(_COLUMN_PLACEHOLDER, column).replace(
+        _DIRECTION_PLACEHOLDER, order_dir)
+    if url != url_generator(order_col=column, order_dir=order_dir, **params):
+        return None
+    return template
+
+
+def _render_rows(args):
+    """ renders a chunk of records for ``Grid.render_parallel`` """
+    grid, offset, records = args
+    return u"".join(grid._iter_rows(records, offset))
+
+def _is_method(method, function):
+    """ is the bound ``method`` the unbound method ``function``, i.e. not
+    overridden? """
+    return getattr(method, "im_func", None) is function.im_func
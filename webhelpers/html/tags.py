@@ -16,13 +16,14 @@ import datetime
 import logging
 import os
 import re
-import urllib
-import urlparse
 
 from webhelpers import containers
 from webhelpers.html import escape, HTML, literal, url_escape
-import webhelpers.media as media
-from webhelpers.misc import NotGiven
+from webhelpers.html.builder import FrozenAttrs
+from webhelpers.misc import LazyModule, NotGiven
+
+# Needed only by ``image()``.
+media = LazyModule("webhelpers.media")
 
 __all__ = [
            # Form tags
@@ -47,6 +48,7 @@ __all__ = [
 log = logging.getLogger(__name__)
 
 NL = literal("\n")
+_SELECTED_OPTION = literal(u'<option selected="selected"')
 BR = literal("<br />\n")
 
 def form(url, method="post", multipart=False, hidden_fields=None, **attrs):
@@ -372,31 +374,22 @@ def select(name, selected_values, options, id=NotGiven, **attrs):
         selected_values = (selected_values,)
     # Cast integer values to strings
     selected_values = map(unicode, selected_values)
+    # Canonicalize the options and make the HTML options.  Options objects
+    # cache their rendered HTML, so they're faster if used repeatedly.
+    if isinstance(options, Options):
+        html_options = options.render(selected_values)
+    else:
+        html_options = Options(options)._render(frozenset(selected_values))
     # Prepend the prompt
     prompt = attrs.pop("prompt", None)
     if prompt:
-        options = [Option("", prompt)] + list(options)
-    # Canonicalize the options and make the HTML options.
-    if not isinstance(options, Options):
-        options = Options(options)
-    html_options = []
-    # Create the options structure
-    def gen_opt(val, label):
-        if val in selected_values:
-            return HTML.option(label, value=val, selected="selected")
+        prompt_option = Options([Option("", prompt)])
+        prompt_html = prompt_option._render(frozenset(selected_values))
+        if html_options:
+            html_options = prompt_html + NL + html_options
         else:
-            return HTML.option(label, value=val)
-    # Loop options and create tree (if optgroups presents)
-    for opt in options:
-        if isinstance(opt, OptGroup):
-            optgroup_options = []
-            for subopt in opt.options:
-                optgroup_options.append(gen_opt(subopt.value, subopt.label))
-            optgroup = HTML.optgroup(NL, NL.join(optgroup_options), NL, label=opt.label)
-            html_options.append(optgroup)
-        else:
-            html_options.append(gen_opt(opt.value, opt.label))
-    return HTML.select(NL, NL.join(html_options), NL, **attrs)
+            html_options = prompt_html
+    return HTML.select(NL, html_options, NL, **attrs)
 
 
 class ModelTags(object):
@@ -661,6 +654,10 @@ class Options(tuple):
       rather than a list to guarantee that nonconformant elements won't be 
       added after canonicalization.
     - Provide convenience methods to iterate the values and labels separately.
+    - Cache the rendered <option> tags, so that a list which is displayed
+      often (e.g., a list of countries) isn't rebuilt every time.  Create the
+      ``Options`` once (e.g., at module level) and pass it to ``select()``
+      to take advantage of this.
 
     >>> opts = Options(["A", 1, ("b", "B")])
     >>> opts
@@ -700,6 +697,12 @@ class Options(tuple):
         data = [x for x in self]
         return "%s(%s)" % (classname, data)
         
+    # Maximum number of distinct selections to cache rendered HTML for.
+    render_cache_size = 32
+
+    render_cache = None
+    _prerendered = None
+
     def values(self):
         """Iterate the value element of each pair."""
         return (x.value for x in self)
@@ -708,6 +711,66 @@ class Options(tuple):
         """Iterate the label element of each pair."""
         return (x.label for x in self)
 
+    def render(self, selected_values=()):
+        """Return the <option> and <optgroup> tags separated by newlines.
+
+        ``selected_values`` is an iterable of the values to mark selected.
+        The result is cached in ``.render_cache``, an ``LRUCache`` keyed by
+        the set of selected values.
+
+        >>> opts = Options([(1, "One"), (2, "Two")])
+        >>> opts.render([2])
+        literal(u'<option value="1">One</option>\\n<option selected="selected" value="2">Two</option>')
+        """
+        selected = frozenset([unicode(x) for x in selected_values])
+        if self.render_cache is None:
+            self.render_cache = containers.LRUCache(self.render_cache_size)
+        html = self.render_cache.get(selected)
+        if html is None:
+            html = self.render_cache[selected] = self._render(selected)
+        return html
+
+    def _render(self, selected):
+        """Render the options without consulting the cache.
+
+        ``selected`` is a set of unicode values.  Each option is rendered only
+        once in its unselected form; selected options are derived from that.
+        """
+        prerendered = self._prerendered
+        if prerendered is None:
+            prerendered = []
+            for opt in self:
+                if isinstance(opt, OptGroup):
+                    prerendered.append((opt, None))
+                else:
+                    html = HTML.option(opt.label, value=opt.value)
+                    prerendered.append((opt.value, html))
+            self._prerendered = prerendered
+        html_options = []
+        for value, html in prerendered:
+            if html is None:
+                group = value
+                optgroup = HTML.optgroup(NL, group.options._render(selected),
+                    NL, label=group.label)
+                html_options.append(optgroup)
+            elif _is_selected(value, selected):
+                # "selected" sorts before "value", the only other attribute.
+                html_options.append(_SELECTED_OPTION + html[len("<option"):])
+            else:
+                html_options.append(html)
+        return NL.join(html_options)
+
+def _is_selected(value, selected):
+    """Is the option value in the set of selected values?
+
+    An unhashable value can't be looked up in the set, so compare it with
+    each selected value as ``select()`` used to.
+    """
+    try:
+        return value in selected
+    except TypeError:
+        return value in list(selected)
+
 def title(title, required=False, label_for=None):
     """Format the user-visible title for a form field.
 
@@ -1048,6 +1111,8 @@ def css_classes(value_condition_pairs):
     def _make_doctype(self, type, uri, dtd):
         return literal('<!DOCTYPE %s PUBLIC "%s" "%s">') % (type, uri, dtd)
 
+_JAVASCRIPT_ATTRS = FrozenAttrs(type="text/javascript")
+
 def javascript_link(*urls, **attrs):
     """Return script include tags for the specified javascript URLs.
     
@@ -1071,7 +1136,7 @@ def javascript_link(*urls, **attrs):
     convert_boolean_attrs(attrs, ["defer"])
     tags = []
     for url in urls:
-        tag = HTML.script("", type="text/javascript", src=url, **attrs)
+        tag = HTML.script("", src=url, _attrs=_JAVASCRIPT_ATTRS, **attrs)
         tags.append(tag)
     return literal("\n").join(tags)
 
@@ -8,6 +8,7 @@ import re
 import urllib
 import warnings
 
+from webhelpers.cache import cached
 from webhelpers.html import HTML, literal, lit_sub, escape
 import webhelpers.html.tags as tags
 
@@ -249,6 +250,7 @@ def mail_to(email_address, name=None, cc=None, bcc=None, subject=None,
 
 
 
+@cached()
 def highlight(text, phrase, highlighter=None, case_sensitive=False, 
     class_="highlight", **attrs):
     """Highlight all occurrences of ``phrase`` in ``text``.
@@ -286,6 +288,8 @@ def highlight(text, phrase, highlighter=None, case_sensitive=False,
     ``**attrs``:
         Additional HTML attributes for the <strong> tag.
 
+    The result is cached if a ``webhelpers.cache`` backend is set.
+
     Changed in WebHelpers 1.0b2: new implementation using HTML builder.
     Allow ``phrase`` to be list or regex.  Deprecate ``highlighter`` and
     change its default value to None. Add ``case_sensitive``, ``class_``,
@@ -324,6 +328,7 @@ def _legacy_highlight(text, phrase, highlighter, flags):
     return lit_sub(rx, highlighter, text)
     
 
+@cached()
 def auto_link(text, link="all", **href_attrs):
     """
     Turn all urls and email addresses into clickable links.
@@ -339,7 +344,8 @@ def auto_link(text, link="all", **href_attrs):
     
         >>> auto_link("Go to http://www.planetpython.com and say hello to guido@python.org")
         literal(u'Go to <a href="http://www.planetpython.com">http://www.planetpython.com</a> and say hello to <a href="mailto:guido@python.org">guido@python.org</a>')
-        
+
+    The result is cached if a ``webhelpers.cache`` backend is set.
     """
     if not text:
         return literal(u"")
@@ -2,6 +2,7 @@
 """
 
 import itertools
+import sys
 import traceback
 import types
 import warnings
@@ -173,6 +174,41 @@ class NotGiven(object):
     pass
 
 
+class LazyModule(object):
+    """A stand-in for a module which is imported the first time it's used.
+
+    Use this for large modules which are needed by only a few functions, so
+    that importing the module which refers to them stays fast::
+
+        textile = LazyModule("webhelpers.textile")
+
+        def textilize(text):
+            # ``webhelpers.textile`` is imported here on the first call.
+            return textile.Textiler(text).process()
+    """
+
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+
+    def _load(self):
+        """Import the module if necessary and return it."""
+        if self._module is None:
+            __import__(self._name)
+            self._module = sys.modules[self._name]
+        return self._module
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+    def __repr__(self):
+        if self._module is None:
+            state = "not loaded"
+        else:
+            state = "loaded"
+        return "<LazyModule %r (%s)>" % (self._name, state)
+
+
 class DeclarativeException(Exception):
     """A simpler way to define an exception with a fixed message.
 
@@ -311,6 +311,8 @@ class Stats(SimpleStats):
 
 #### Number formatting ####
 
+_thousands_rx = re.compile(R"(\d)(?=(\d\d\d)+(?!\d))")
+
 def format_number(n, thousands=",", decimal="."):
     """Format a number with a thousands separator and decimal delimiter.
 
@@ -338,12 +340,45 @@ def format_number(n, thousands=",", decimal="."):
     '1.234.567,89'
     """
     parts = str(n).split(".")
-    parts[0] = re.sub(
-        R"(\d)(?=(\d\d\d)+(?!\d))", 
-        R"\1%s" % thousands, 
-        parts[0])
+    parts[0] = _thousands_rx.sub(R"\1%s" % thousands, parts[0])
     return decimal.join(parts)
 
+def format_numbers(numbers, thousands=",", decimal="."):
+    """Format a sequence of numbers like ``format_number()``, returning a list
+    of strings.
+
+    This is faster than calling ``format_number()`` for each number: the
+    thousands separators are inserted in one pass over all the numbers.
+
+    >>> format_numbers([1234567, -1234, 12])
+    ['1,234,567', '-1,234', '12']
+    >>> format_numbers([1234567.89, 1234.5], ".", ",")
+    ['1.234.567,89', '1.234,5']
+    """
+    strings = [str(n) for n in numbers]
+    if not strings:
+        return strings
+    repl = R"\1%s" % thousands
+    sub = _thousands_rx.sub
+    if "\n" in thousands:
+        result = []
+        for s in strings:
+            parts = s.split(".")
+            parts[0] = sub(repl, parts[0])
+            result.append(decimal.join(parts))
+        return result
+    text = "\n".join(strings)
+    if "." not in text:
+        return sub(repl, text).split("\n")
+    # Insert the separators into the integer parts only.
+    parts = [s.split(".") for s in strings]
+    ints = sub(repl, "\n".join([p[0] for p in parts])).split("\n")
+    result = []
+    for p, n in zip(parts, ints):
+        p[0] = n
+        result.append(decimal.join(p))
+    return result
+
 def format_data_size(size, unit, precision=1, binary=False, full_name=False):
     """Format a number using SI units (kilo, mega, etc.).
 
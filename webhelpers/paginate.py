@@ -148,6 +148,21 @@ complete URL. Other callbacks may find ``webhelpers.utl.update_params`` useful,
 which overrides query parameters on a more general basis.
 
 
+Keyset pagination
+-----------------
+
+For large tables, ``KeysetPage`` avoids the count and the ever-larger offset
+that ``Page`` needs. It finds a page by the sort key of the item before it,
+so there are only "previous" and "next" links::
+
+    after = request.GET.get("after")
+    before = request.GET.get("before")
+    records = paginate.KeysetPage(q, MyModel.id,
+        after=after and int(after), before=before and int(before),
+        url=paginate.PageURL_WebOb(request))
+    records.pager()     # Links with "?after=..." or "?before=..."
+
+
 Can I use AJAX / AJAH?
 ------------------------
 
@@ -171,28 +186,78 @@ http://workaround.org/cgi-bin/hg-paginate that is known at the
 WebHelpers. (c) 2007-2011.
 """
 
+import binascii
+import itertools
+import operator
+import os
 import re
 from string import Template
+import sys
+import threading
+import time
+import types
 import urllib
 import warnings
 
+from webhelpers.cache import MemoryBackend, make_key
+from webhelpers.containers import LRUCache
 from webhelpers.html import literal, HTML
+from webhelpers.html.builder import FrozenAttrs
 
 INCOMPATIBLE_COLLECTION_TYPE = """\
 Sorry, your collection type is not supported by the paginate module. You can
 provide a list, a tuple, a SQLAlchemy " "select object or a SQLAlchemy
 ORM-query object."""
 
-# import SQLAlchemy if available
-try:
-    import sqlalchemy
-    import sqlalchemy.orm   # Some users report errors if this is not imported.
-except:
-    sqlalchemy_available = False
-    sqlalchemy_version = None
-else:
-    sqlalchemy_available = True
-    sqlalchemy_version = sqlalchemy.__version__
+# A page number for making URL templates, which URL generators won't change
+# when they escape it.
+_PAGE_PLACEHOLDER = "__webhelpers_paginate_page__"
+
+def _get_sqlalchemy():
+    """Return the ``sqlalchemy`` package if the application has imported it.
+
+    A collection can't be a SQLAlchemy object unless SQLAlchemy has been
+    imported, so we don't import it ourselves; it's slow to import.  Return
+    None if it hasn't been imported or if it's version 0.3 (unsupported).
+    """
+    if "sqlalchemy" not in sys.modules:
+        return None
+    try:
+        import sqlalchemy
+        import sqlalchemy.orm   # Some users report errors if this is not imported.
+    except:
+        return None
+    if sqlalchemy.__version__[:3] == '0.3':
+        return None
+    return sqlalchemy
+
+#### COLLECTION ADAPTERS
+_adapters = []
+
+def register_adapter(cls, factory):
+    """Tell ``Page`` how to page through collections of a certain type.
+
+    ``cls`` is a class or a tuple of classes.  ``factory`` is a function
+    which takes such a collection and returns a ``CollectionAdapter`` for
+    it; usually the adapter class itself.  Adapters registered later take
+    precedence, and all of them take precedence over the built-in support
+    for SQLAlchemy and sequences.
+    """
+    _adapters.append((cls, factory))
+
+def unregister_adapter(cls, factory=None):
+    """Undo the latest ``register_adapter()`` call for ``cls`` (and
+    ``factory``, if given).
+
+    Raise ValueError if there's no such registration.
+    """
+    for i in range(len(_adapters) - 1, -1, -1):
+        registered_cls, registered_factory = _adapters[i]
+        if registered_cls == cls and \
+            (factory is None or registered_factory is factory):
+            del _adapters[i]
+            return
+    raise ValueError("no adapter registered for %r" % (cls,))
 
 def get_wrapper(obj, sqlalchemy_session=None):
     """
@@ -203,10 +268,17 @@ def get_wrapper(obj, sqlalchemy_session=None):
     if isinstance(obj, (list, tuple)):
         return obj
 
+    if isinstance(obj, CollectionAdapter):
+        return obj
+    for cls, factory in reversed(_adapters):
+        if isinstance(obj, cls):
+            return factory(obj)
+
     # Is SQLAlchemy 0.4 or better available? (0.3 is not supported - sorry)
     # Note: SQLAlchemy objects aren't sliceable, so this has to be before
     # the next if-stanza
-    if sqlalchemy_available and sqlalchemy_version[:3] != '0.3':
+    sqlalchemy = _get_sqlalchemy()
+    if sqlalchemy is not None:
         # Is the collection a query?
         if isinstance(obj, sqlalchemy.orm.query.Query):
             return _SQLAlchemyQuery(obj)
@@ -227,13 +299,169 @@ def get_wrapper(obj, sqlalchemy_session=None):
     else:
         return obj
 
+    # An iterator (e.g. a file or a CSV reader) can be streamed.
+    try:
+        if iter(obj) is obj:
+            return IteratorAdapter(obj)
+    except TypeError:
+        pass
+
     raise TypeError(INCOMPATIBLE_COLLECTION_TYPE)
 
+class CollectionAdapter(object):
+    """Base class for adapters which let ``Page`` page through a kind of
+    collection.
+
+    Subclasses implement ``slice()`` and ``count()``, or ``slice_and_count()``
+    if the backend returns the total number of items along with a range of
+    them.  Pass an adapter to ``Page`` as the collection, or register the
+    adapter class with ``register_adapter()`` to have it used for the
+    collections themselves.
+
+    Two class attributes tell ``Page`` how to count, unless the ``Page`` is
+    given an ``item_count`` or a ``counter``:
+
+    cheap_count
+        True if ``count()`` is fast, so it's called before fetching the
+        page, as for other collections.  Default True.
+
+    has_total
+        True if ``slice_and_count()`` returns the total.  If ``cheap_count``
+        is false, ``Page`` gets the total while fetching the page (like
+        ``WindowCount``).  If neither is true, ``Page`` doesn't count at all
+        (like ``HasMore``).  Default False.
+    """
+    cheap_count = True
+    has_total = False
+
+    def __init__(self, obj):
+        self.obj = obj
+
+    def count(self):
+        """Return the number of items."""
+        raise NotImplementedError("subclass responsibility")
+
+    def slice(self, start, stop):
+        """Return a list of the items from index ``start`` up to ``stop``."""
+        raise NotImplementedError("subclass responsibility")
+
+    def slice_and_count(self, start, stop):
+        """Return a list of the items from ``start`` up to ``stop``, and the
+        total number of items or None if it's not known.
+        """
+        return self.slice(start, stop), None
+
+    def cache_key(self):
+        """Return a string identifying the query, for caches such as
+        ``CountCache`` and ``WindowCache``; or None if the collection
+        shouldn't be cached.  Default None.
+        """
+        return None
+
+    def __len__(self):
+        return self.count()
+
+    def __getitem__(self, range):
+        if not isinstance(range, slice):
+            raise TypeError("__getitem__ without slicing not supported")
+        return self.slice(range.start, range.stop)
+
+
+class DBAPIQuery(CollectionAdapter):
+    """Page through the result of an SQL query on a DB-API connection.
+
+    ``sql`` and ``params`` are passed to the cursor's ``execute`` method.
+    A page is fetched by appending LIMIT and OFFSET clauses to the query,
+    and the count is ``SELECT count(*) FROM (<sql>) AS sub``.  This syntax
+    is supported by SQLite, PostgreSQL, and MySQL.
+    """
+
+    def __init__(self, connection, sql, params=()):
+        CollectionAdapter.__init__(self, sql)
+        self.connection = connection
+        self.sql = sql
+        self.params = params
+
+    def count(self):
+        sql = "SELECT count(*) FROM (%s) AS sub" % self.sql
+        return self._execute(sql)[0][0]
+
+    def slice(self, start, stop):
+        sql = "%s LIMIT %d OFFSET %d" % (self.sql, stop - start, start)
+        return self._execute(sql)
+
+    def cache_key(self):
+        return make_key("webhelpers.paginate.DBAPIQuery",
+            (self.sql, self.params))
+
+    def _execute(self, sql):
+        cursor = self.connection.cursor()
+        try:
+            cursor.execute(sql, self.params)
+            return cursor.fetchall()
+        finally:
+            cursor.close()
+
+
+class SearchResults(CollectionAdapter):
+    """Page through the hits of a search API which returns the total number
+    of hits along with each range of them, as Elasticsearch does.
+
+    ``search`` is a function ``search(offset, limit)`` which returns a tuple
+    ``(hits, total)``.  ``Page`` calls it only once per page.
+    """
+    cheap_count = False
+    has_total = True
+
+    def __init__(self, search):
+        CollectionAdapter.__init__(self, search)
+        self.search = search
+
+    def count(self):
+        return self.search(0, 0)[1]
+
+    def slice(self, start, stop):
+        return self.slice_and_count(start, stop)[0]
+
+    def slice_and_count(self, start, stop):
+        hits, total = self.search(start, stop - start)
+        return list(hits), total
+
+
+class IteratorAdapter(CollectionAdapter):
+    """Stream the items of an iterable which has no length and can't be
+    sliced, such as a generator or a file.
+
+    Items before the page are skipped without keeping them, and one item
+    after the page is read to tell whether there's a next page; so only
+    one page is in memory.  The items aren't counted, so the page's
+    ``item_count`` is None and its pager has only previous and next
+    links.  The iterable is consumed, so make a new one for each page.
+
+    Generators and other iterators are streamed automatically; use this
+    class directly to stream other iterables.
+    """
+    cheap_count = False
+
+    def __init__(self, obj):
+        self.obj = obj
+        self.iterator = iter(obj)
+
+    def count(self):
+        raise TypeError("can't count the items in an iterator")
+
+    def slice(self, start, stop):
+        return list(itertools.islice(self.iterator, start, stop))
+
+register_adapter(types.GeneratorType, IteratorAdapter)
+
+
 class _SQLAlchemySelect(object):
     """
     Iterable that allows to get slices from an SQLAlchemy Select object
     """
     def __init__(self, obj, sqlalchemy_session=None):
+        sqlalchemy = _get_sqlalchemy()
         session_types = (
             sqlalchemy.orm.scoping.ScopedSession,
             sqlalchemy.orm.Session)
@@ -254,7 +482,82 @@ class _SQLAlchemySelect(object):
         return self.sqlalchemy_session.execute(select).fetchall()
 
     def __len__(self):
-        return self.sqlalchemy_session.execute(self.obj).rowcount
+        # Count in the database.  (The DB-API's rowcount would require
+        # executing the whole select, and is -1 for SELECTs in many
+        # drivers.)  The subquery's ORDER BY is dropped because it doesn't
+        # affect the count, and some databases don't allow it.
+        return self.sqlalchemy_session.execute(self._count_select()).scalar()
+
+    def detached_len(self):
+        """Count the rows using a new connection rather than the session.
+
+        This can be called from another thread.  It won't see changes
+        which are not committed.
+        """
+        bind = self.sqlalchemy_session.get_bind(clause=self.obj)
+        conn = bind.connect()
+        try:
+            return conn.execute(self._count_select()).scalar()
+        finally:
+            conn.close()
+
+    def _count_select(self):
+        sqlalchemy = _get_sqlalchemy()
+        subquery = self.obj.order_by(None).alias("sub")
+        return sqlalchemy.select([sqlalchemy.func.count()]) \
+            .select_from(subquery)
+
+    def slice_and_count(self, start, stop):
+        """Return the rows from ``start`` to ``stop`` and the total number of
+        rows, in one query.
+
+        The total is computed by adding ``count(*) OVER ()`` to the select,
+        so each row has an extra last column named 'paginate_total'.  The
+        total is None if the database doesn't support window functions, if
+        the select is a compound select (UNION etc), or if there are no rows
+        in the range; the caller should then count separately.
+        """
+        if not hasattr(self.obj, "column") or not self._window_functions():
+            return self[start:stop], None
+        sqlalchemy = _get_sqlalchemy()
+        total = sqlalchemy.func.count().over().label("paginate_total")
+        select = self.obj.column(total).offset(start).limit(stop - start)
+        rows = self.sqlalchemy_session.execute(select).fetchall()
+        if not rows:
+            return rows, None
+        return rows, rows[0][-1]
+
+    def _window_functions(self):
+        """Does the database support window functions?"""
+        try:
+            dialect = self.sqlalchemy_session.get_bind(clause=self.obj).dialect
+        except Exception:
+            return False
+        if dialect.name == "sqlite":
+            return dialect.dbapi.sqlite_version_info >= (3, 25)
+        if dialect.name == "mysql":
+            version = dialect.server_version_info or ()
+            # MariaDB 10.2 and MySQL 8.
+            return version >= (10, 2) or \
+                (version >= (8,) and "MariaDB" not in version)
+        return True
+
+    def seek(self, key, after=None, before=None, limit=None):
+        """Return up to ``limit`` rows adjacent to a key value, in key order.
+
+        See ``_seek()``.
+        """
+        select = self.obj
+        if before is not None:
+            select = select.where(key < before).order_by(key.desc())
+        else:
+            if after is not None:
+                select = select.where(key > after)
+            select = select.order_by(key)
+        rows = self.sqlalchemy_session.execute(select.limit(limit)).fetchall()
+        if before is not None:
+            rows.reverse()
+        return rows
 
 class _SQLAlchemyQuery(object):
     """
@@ -271,6 +574,462 @@ class _SQLAlchemyQuery(object):
     def __len__(self):
         return self.obj.count()
 
+    def detached_len(self):
+        """Count the objects using a new session.
+
+        This can be called from another thread.  It won't see changes
+        which are not committed.
+        """
+        sqlalchemy = _get_sqlalchemy()
+        bind = self.obj.session.get_bind(clause=self.obj.statement)
+        session = sqlalchemy.orm.Session(bind=bind)
+        try:
+            return self.obj.with_session(session).count()
+        finally:
+            session.close()
+
+    def seek(self, key, after=None, before=None, limit=None):
+        """Return up to ``limit`` objects adjacent to a key value, in key
+        order.
+
+        See ``_seek()``.
+        """
+        query = self.obj
+        if before is not None:
+            query = query.filter(key < before).order_by(key.desc())
+        else:
+            if after is not None:
+                query = query.filter(key > after)
+            query = query.order_by(key)
+        items = query.limit(limit).all()
+        if before is not None:
+            items.reverse()
+        return items
+
+#### COUNT STRATEGIES
+class CountStrategy(object):
+    """Base class for ``Page``'s ``counter`` argument.
+
+    A strategy decides how to find the number of items in a collection.
+    """
+
+    def count(self, page):
+        """Return the number of items in ``page.collection``.
+
+        ``page`` is the ``Page`` being constructed; its ``collection`` and
+        ``original_collection`` attributes are set.  Return None to page
+        without a count, as ``HasMore`` does.
+        """
+        raise NotImplementedError("subclass responsibility")
+
+
+class CountCache(CountStrategy):
+    """Count SQLAlchemy collections once and reuse the count for ``ttl``
+    seconds.
+
+    The count is keyed by the database URL and the query's compiled SQL and
+    parameters, so each distinct query is counted separately.  Keep one
+    instance for the life of the application::
+
+        note_counts = paginate.CountCache(60)
+        ...
+        page = paginate.Page(q, page_number, counter=note_counts)
+
+    The count may be out of date by up to ``ttl`` seconds.  If the last page
+    is then short or empty, that's usually acceptable; otherwise call
+    ``.clear()`` when the data changes.
+
+    ``backend`` is a ``webhelpers.cache`` backend storing the counts; the
+    default is a ``MemoryBackend`` holding 1000.  Other collections and
+    queries with parameters which can't be keyed are counted every time.
+    """
+
+    def __init__(self, ttl=60, backend=None):
+        if backend is None:
+            backend = MemoryBackend(1000)
+        self.ttl = ttl
+        self.backend = backend
+
+    def count(self, page):
+        key = self.cache_key(page.collection)
+        if key is None:
+            return len(page.collection)
+        now = time.time()
+        cached = self.backend.get(key)
+        if cached is not None and cached[0] > now:
+            return cached[1]
+        item_count = len(page.collection)
+        self.backend.set(key, (now + self.ttl, item_count))
+        return item_count
+
+    def cache_key(self, collection):
+        """Return the cache key for a collection wrapper, or None if it
+        can't be keyed.
+        """
+        query_key = _query_key(collection)
+        if query_key is None:
+            return None
+        return make_key("webhelpers.paginate.count", (query_key,))
+
+    def clear(self):
+        """Forget all counts."""
+        self.backend.clear()
+
+
+class EstimatedCount(CountStrategy):
+    """Use an estimate of the number of items rather than counting them.
+
+    ``estimate`` is a function which takes the collection passed to ``Page``
+    and returns the approximate number of items; for instance, from the
+    database's table statistics (PostgreSQL's ``pg_class.reltuples``).  If
+    the estimate is too high, the last pages will be short or empty.
+    """
+
+    def __init__(self, estimate):
+        self.estimate = estimate
+
+    def count(self, page):
+        return int(self.estimate(page.original_collection))
+
+
+class WindowCount(CountStrategy):
+    """Count an SQLAlchemy select in the same query as fetching the page.
+
+    This saves a round trip to the database.  The page's query includes
+    ``count(*) OVER ()``, so each row has an extra last column,
+    'paginate_total'.  If the database doesn't support window functions,
+    or the select is a compound select, or the requested page is past the
+    end, the count is a separate query.  ``CollectionAdapter`` collections
+    are fetched with ``slice_and_count()``, and other collections are
+    counted with ``len()``.
+
+    The database still has to find all the rows to count them, and some
+    (SQLite in particular) are slower at this than a separate count.  Use
+    this where the round trip to the database server is the larger cost;
+    'benchmarks/bench_paginate_count.py' measures both.
+    """
+
+    def count(self, page):
+        collection = page.collection
+        if not hasattr(collection, "slice_and_count"):
+            return len(collection)
+        start = (max(page.page, 1) - 1) * page.items_per_page
+        stop = start + page.items_per_page
+        items, item_count = collection.slice_and_count(start, stop)
+        page._prefetched = (start, items)
+        if item_count is None:
+            return len(collection)
+        return item_count
+
+
+class ConcurrentCount(CountStrategy):
+    """Count the collection in another thread while fetching the page.
+
+    The two queries overlap instead of running one after the other, so a
+    page takes about as long as the slower of them.  The page is fetched
+    in the calling thread, assuming the requested page number is valid; if
+    the count shows that it's past the end, the last page is fetched
+    afterward.
+
+    SQLAlchemy sessions can't be used by two threads at once, so SQLAlchemy
+    collections are counted with a separate connection.  It can't see
+    changes in the session's transaction which are not committed, and it
+    can't work with an in-memory SQLite database.  Other collections are
+    counted with ``len()`` in the calling thread, as usual; an adapter can
+    define a ``detached_len()`` method to be counted in another thread.
+    """
+
+    def count(self, page):
+        collection = page.collection
+        counter = getattr(collection, "detached_len", None)
+        if counter is None:
+            # A sequence's length is free; a thread would only add overhead.
+            return len(collection)
+        result = []
+        def run():
+            try:
+                result.append(counter())
+            except:
+                result.append(sys.exc_info())
+        thread = threading.Thread(target=run)
+        thread.start()
+        try:
+            start = (max(page.page, 1) - 1) * page.items_per_page
+            stop = start + page.items_per_page
+            page._prefetched = (start, list(collection[start:stop]))
+        finally:
+            thread.join()
+        if isinstance(result[0], tuple):
+            exc_type, exc_value, traceback = result[0]
+            raise exc_type, exc_value, traceback
+        return result[0]
+
+
+class HasMore(CountStrategy):
+    """Don't count the items.  ``Page`` fetches one item more than a page to
+    find out whether there's a next page.
+
+    The page's ``item_count`` and ``page_count`` are None, and its
+    ``last_page`` is the next page if there is one, otherwise the current
+    page.  The pager can't link to the real last page, so ``$link_last`` is
+    empty and the page range ends at the next page.  The pager's default
+    format has only the previous and next links.
+    """
+
+    def count(self, page):
+        return None
+
+
+def _query_key(collection, sqlalchemy_session=None):
+    """Return a string identifying the query behind a collection, for
+    caching; or None if it's not a query or can't be keyed.
+
+    SQLAlchemy queries and selects are identified by the database they run
+    on (the URL of the session's bind) and their compiled SQL and
+    parameters.  ``collection`` may be such an object or its wrapper, or a
+    ``CollectionAdapter``.  A bare select is run on ``sqlalchemy_session``,
+    or else on the select's own bind.
+    """
+    if isinstance(collection, _SQLAlchemySelect):
+        sqlalchemy_session = collection.sqlalchemy_session
+        collection = collection.obj
+    elif isinstance(collection, _SQLAlchemyQuery):
+        collection = collection.obj
+    elif isinstance(collection, CollectionAdapter):
+        return collection.cache_key()
+    sqlalchemy = _get_sqlalchemy()
+    if sqlalchemy is None:
+        return None
+    if isinstance(collection, sqlalchemy.orm.query.Query):
+        statement = collection.statement
+        sqlalchemy_session = collection.session
+    elif isinstance(collection, (sqlalchemy.sql.expression.Select,
+        sqlalchemy.sql.expression.CompoundSelect)):
+        statement = collection
+    else:
+        return None
+    try:
+        if sqlalchemy_session is not None:
+            bind = sqlalchemy_session.get_bind(clause=statement)
+        else:
+            bind = getattr(statement, "bind", None)
+    except sqlalchemy.exc.UnboundExecutionError:
+        bind = None
+    if bind is None:
+        return None
+    # A Connection's engine, or the Engine itself.
+    url = str(bind.engine.url)
+    compiled = statement.compile()
+    return make_key("webhelpers.paginate.query",
+        (url, unicode(compiled), compiled.params))
+
+
+#### PAGE WINDOW CACHE
+class WindowCache(object):
+    """Fetch several pages at once and keep them for later requests.
+
+    Users often go through the pages in order.  With a window cache, the
+    first request fetches ``pages`` pages' worth of items in one query and
+    stores them in the cache; requests for the other pages in the window
+    are served from the cache.  Keep one instance for the life of the
+    application, and pass it to ``Page`` as ``window_cache``::
+
+        note_pages = paginate.WindowCache(5, ttl=60)
+        ...
+        page = paginate.Page(q, page_number, window_cache=note_pages)
+
+    Windows are keyed by the query (its database URL, compiled SQL and
+    parameters) and by their position and size.  Only SQLAlchemy queries
+    and selects and ``CollectionAdapter`` instances with a ``cache_key()``
+    are cached; other collections are sliced as usual.  The window cache
+    doesn't count; combine it with a ``CountCache`` to avoid that query
+    too.
+
+    ``backend`` is a ``webhelpers.cache`` backend storing the windows; the
+    default is a ``MemoryBackend`` holding 100.  ORM objects are stored as
+    detached copies, and each request gets its own instances, merged into
+    its query's session without loading them again.  Windows of rows which
+    combine ORM objects with other columns, or of objects with unsaved
+    changes, aren't cached.
+
+    ``ttl`` is the number of seconds a window is kept, or None to keep it
+    until it's invalidated or the backend evicts it.  Call
+    ``.invalidate(collection)`` when a collection's data changes, or
+    ``.clear()`` to forget everything.
+    """
+
+    def __init__(self, pages=5, backend=None, ttl=None):
+        if backend is None:
+            backend = MemoryBackend(100)
+        self.pages = pages
+        self.backend = backend
+        self.ttl = ttl
+
+    def slice(self, page, start, stop):
+        """Return the items of ``page.collection`` from ``start`` up to
+        ``stop``, from the cache if possible.
+        """
+        collection = page.collection
+        query_key = _query_key(collection)
+        if query_key is None:
+            return list(collection[start:stop])
+        generation = self._generation(query_key)
+        size = self.pages * page.items_per_page
+        items = []
+        window_start = start - start % size
+        while window_start < stop:
+            window = self._window(collection, query_key, generation,
+                window_start, size)
+            items.extend(window[max(start - window_start, 0):
+                stop - window_start])
+            if len(window) < size:
+                break
+            window_start += size
+        return items
+
+    def invalidate(self, collection, sqlalchemy_session=None):
+        """Forget the cached windows of a collection.
+
+        ``collection`` is the query or select passed to ``Page``, or an
+        equivalent one.  For a select, pass the ``sqlalchemy_session`` it
+        was paged with too.
+        """
+        query_key = _query_key(collection, sqlalchemy_session)
+        if query_key is not None:
+            self.backend.set(self._generation_key(query_key), _new_token())
+
+    def clear(self):
+        """Forget all cached windows."""
+        self.backend.clear()
+
+    def _window(self, collection, query_key, generation, start, size):
+        """Return the window of ``size`` items beginning at ``start``."""
+        key = make_key("webhelpers.paginate.window",
+            (query_key, generation, start, size))
+        now = time.time()
+        cached = self.backend.get(key)
+        if cached is not None and (cached[0] is None or cached[0] > now):
+            return self._load(collection, cached[1])
+        window = list(collection[start:start + size])
+        stored = self._store(collection, window)
+        if stored is not None:
+            expires = None
+            if self.ttl is not None:
+                expires = now + self.ttl
+            self.backend.set(key, (expires, stored))
+        return window
+
+    def _store(self, collection, window):
+        """Return the items of a window to store in the backend, or None if
+        it can't be cached.
+
+        ORM objects are copied to a throwaway session which is then
+        emptied, so the copies aren't attached to the requesting session.
+        """
+        if not isinstance(collection, _SQLAlchemyQuery):
+            return window
+        sqlalchemy = _get_sqlalchemy()
+        session = sqlalchemy.orm.Session()
+        stored = []
+        try:
+            for item in window:
+                if _is_mapped(item):
+                    item = session.merge(item, load=False)
+                elif isinstance(item, tuple):
+                    for value in item:
+                        if _is_mapped(value):
+                            return None
+                stored.append(item)
+        except sqlalchemy.exc.InvalidRequestError:
+            # An object with unsaved changes.
+            return None
+        session.expunge_all()
+        return stored
+
+    def _load(self, collection, stored):
+        """Return the items of a stored window, merging copies of its ORM
+        objects into the query's session.
+        """
+        if not isinstance(collection, _SQLAlchemyQuery):
+            return stored
+        session = collection.obj.session
+        window = []
+        for item in stored:
+            if _is_mapped(item):
+                item = session.merge(item, load=False)
+            window.append(item)
+        return window
+
+    def _generation(self, query_key):
+        """Return the token which identifies the current windows of a query.
+
+        Invalidating a query gives it a new token, so its old windows are
+        no longer found.  The token is random rather than a counter, so if
+        the backend evicts it, the old windows aren't found either.
+        """
+        key = self._generation_key(query_key)
+        generation = self.backend.get(key)
+        if generation is None:
+            generation = _new_token()
+            self.backend.set(key, generation)
+        return generation
+
+    def _generation_key(self, query_key):
+        return make_key("webhelpers.paginate.window.generation", (query_key,))
+
+def _is_mapped(item):
+    """Is ``item`` an instance of an ORM-mapped class?"""
+    sqlalchemy = _get_sqlalchemy()
+    try:
+        sqlalchemy.orm.attributes.instance_state(item)
+    except sqlalchemy.orm.exc.NO_STATE:
+        return False
+    return True
+
+def _new_token():
+    return binascii.hexlify(os.urandom(8))
+
+
+def _seek(collection, key, after=None, before=None, limit=None):
+    """Return up to ``limit`` items next to a key value, in ascending order.
+
+    If ``before`` is given, return the items immediately preceding it: in SQL,
+    ``WHERE key < :before ORDER BY key DESC LIMIT :limit``, reversed.
+    Otherwise return the items following ``after``: ``WHERE key > :after
+    ORDER BY key LIMIT :limit``.  If both are None, start at the beginning.
+
+    ``collection`` is a wrapper from ``get_wrapper()``.  SQLAlchemy wrappers
+    have a ``seek`` method.  Other collections are sequences sorted by
+    ``key``, which is a function returning an item's key; they're searched by
+    bisection.
+    """
+    if hasattr(collection, "seek"):
+        return collection.seek(key, after, before, limit)
+    # Bisect for the first index past the items to skip: those <= ``after``,
+    # or those < ``before``.
+    if before is not None:
+        value = before
+    else:
+        value = after
+    lo = 0
+    if value is not None:
+        hi = len(collection)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            k = key(collection[mid])
+            if k < value or (before is None and k == value):
+                lo = mid + 1
+            else:
+                hi = mid
+    if before is not None:
+        start = lo
+        if limit is not None:
+            start = max(0, lo - limit)
+        return list(collection[start:lo])
+    if limit is None:
+        return list(collection[lo:])
+    return list(collection[lo:lo + limit])
+
 # Since the items on a page are mainly a list we subclass the "list" type
 class Page(list):
     """A list/iterator of items representing one page in a larger
@@ -292,7 +1051,8 @@ class Page(list):
     **WARNING:** Unless you pass in an item_count, a count will be 
     performed on the collection every time a Page instance is created. 
     If using an ORM, it's advised to pass in the number of items in the 
-    collection if that number is known.
+    collection if that number is known, or to pass a ``counter`` which
+    caches, estimates, or skips the count.
 
     Instance attributes:
 
@@ -329,14 +1089,16 @@ class Page(list):
     """
     def __init__(self, collection, page=1, items_per_page=20,
         item_count=None, sqlalchemy_session=None, presliced_list=False,
-        url=None, **kwargs):
+        url=None, counter=None, window_cache=None, **kwargs):
         """Create a "Page" instance.
 
         Parameters:
 
         collection
             Sequence, SQLAlchemy select object or SQLAlchemy ORM-query
-            representing the collection of items to page through.
+            representing the collection of items to page through, or
+            another type for which an adapter is registered (see
+            ``register_adapter()``), or a ``CollectionAdapter``.
 
         page
             The requested page number - starts with 1. Default: 1.
@@ -366,6 +1128,18 @@ class Page(list):
             A URL generator function. See module docstring for details.
             This is used only by ``.pager()``.
 
+        counter (optional)
+            A ``CountStrategy`` which finds the number of items if
+            ``item_count`` is not given: ``CountCache``,
+            ``EstimatedCount``, ``WindowCount``, ``ConcurrentCount``, or
+            ``HasMore``.  By default the collection is counted every
+            time, unless it's a ``CollectionAdapter`` whose count isn't
+            cheap.
+
+        window_cache (optional)
+            A ``WindowCache`` which fetches several pages at once and
+            serves the following pages from a cache.
+
         Further keyword arguments are used as link arguments in the pager().
         """
         self._url_generator = url
@@ -405,15 +1179,31 @@ class Page(list):
 
         self.items_per_page = items_per_page
 
+        # A count strategy may fetch the items while counting:
+        # (offset, items).
+        self._prefetched = None
+
         # Unless the user tells us how many items the collections has
         # we calculate that ourselves.
         if item_count is not None:
             self.item_count = item_count
         else:
-            self.item_count = len(self.collection)
+            if counter is None and \
+                not getattr(self.collection, "cheap_count", True):
+                if self.collection.has_total:
+                    counter = WindowCount()
+                else:
+                    counter = HasMore()
+            if counter is not None:
+                self.item_count = counter.count(self)
+            else:
+                self.item_count = len(self.collection)
 
         # Compute the number of the first and last available page
-        if self.item_count > 0:
+        self._window_cache = window_cache
+        if self.item_count is None:
+            self._init_uncounted(presliced_list)
+        elif self.item_count > 0:
             self.first_page = 1
             self.page_count = ((self.item_count - 1) / self.items_per_page) + 1
             self.last_page = self.first_page + self.page_count - 1
@@ -436,6 +1226,12 @@ class Page(list):
             # .items would be accessed.
             if presliced_list:
                 self.items = self.collection
+            elif self._prefetched and \
+                self._prefetched[0] == self.first_item - 1:
+                self.items = list(self._prefetched[1])
+            elif window_cache is not None:
+                self.items = window_cache.slice(self, self.first_item - 1,
+                    self.last_item)
             else:
                 try:
                     first = self.first_item - 1
@@ -470,8 +1266,44 @@ class Page(list):
             self.items = []
 
         # This is a subclass of the 'list' type. Initialise the list now.
+        self._prefetched = self._window_cache = None
         list.__init__(self, self.items)
 
+    def _init_uncounted(self, presliced_list):
+        """Fetch the page without knowing the number of items.
+
+        One more item than a page is fetched; if it's there, there's a next
+        page.
+        """
+        self.page_count = None
+        self.first_page = 1
+        if self.page < self.first_page:
+            self.page = self.first_page
+        offset = (self.page - 1) * self.items_per_page
+        stop = offset + self.items_per_page + 1
+        if presliced_list:
+            items = list(self.collection)
+        elif self._window_cache is not None:
+            items = self._window_cache.slice(self, offset, stop)
+        else:
+            items = list(self.collection[offset:stop])
+        if len(items) > self.items_per_page:
+            self.next_page = self.page + 1
+            del items[self.items_per_page:]
+        else:
+            self.next_page = None
+        self.items = items
+        if items:
+            self.first_item = offset + 1
+            self.last_item = offset + len(items)
+        else:
+            self.first_item = self.last_item = None
+        if self.page > self.first_page:
+            self.previous_page = self.page - 1
+        else:
+            self.previous_page = None
+        self.last_page = self.next_page or self.page
+
 
     def __repr__(self):
         return ("Page:\n"
@@ -500,7 +1332,11 @@ class Page(list):
             'page_count':self.page_count,
             })
 
-    def pager(self, format='~2~', page_param='page', partial_param='partial',
+    def info(self):
+        """Return a ``PageInfo`` with this page's items and numbers."""
+        return PageInfo(self)
+
+    def pager(self, format=None, page_param='page', partial_param='partial',
         show_if_single_page=False, separator=' ', onclick=None,
         symbol_first='<<', symbol_last='>>',
         symbol_previous='<', symbol_next='>',
@@ -533,7 +1369,8 @@ class Page(list):
 
             '1 .. 5 6 7 [8] 9 10 11 .. 500'
 
-            Default: '~2~'
+            Default: '~2~', or '$link_previous $link_next' if the items
+            weren't counted (see ``HasMore``)
 
         symbol_first
             String to be displayed as the text for the %(link_first)s 
@@ -687,54 +1524,64 @@ class Page(list):
         self.onclick = onclick
         self.link_attr = link_attr
         self.dotdot_attr = dotdot_attr
+        self._link_attrs = FrozenAttrs(**link_attr)
+        self._link_params = None
+        self._url_templates = None
+        if format is None:
+            if self.item_count is None:
+                format = '$link_previous $link_next'
+            else:
+                format = '~2~'
 
         # Don't show navigator if there is no more than one page
-        if self.page_count == 0 or (self.page_count == 1 and not show_if_single_page):
+        page_count = self.page_count
+        if page_count is None:   # Not counted
+            page_count = self.last_page
+        if page_count == 0 or (page_count == 1 and not show_if_single_page):
             return ''
 
 
-        # Replace ~...~ in token format by range of pages
-        result = re.sub(r'~(\d+)~', self._range, format)
-
-        # Interpolate '%' variables
-        result = Template(result).safe_substitute({
-            'first_page': self.first_page,
-            'last_page': self.last_page,
-            'page': self.page,
-            'page_count': self.page_count,
-            'items_per_page': self.items_per_page,
-            'first_item': self.first_item,
-            'last_item': self.last_item,
-            'item_count': self.item_count,
-            'link_first': self.page>self.first_page and \
-                    self._pagerlink(self.first_page, symbol_first) or '',
-            'link_last': self.page<self.last_page and \
-                    self._pagerlink(self.last_page, symbol_last) or '',
-            'link_previous': self.previous_page and \
-                    self._pagerlink(self.previous_page, symbol_previous) or '',
-            'link_next': self.next_page and \
-                    self._pagerlink(self.next_page, symbol_next) or ''
-        })
+        # Render the format, compiled to a list of text, ~...~ page ranges,
+        # and $-variables.  Links are made only if they're used.
+        result = []
+        for kind, value in _compile_format(format):
+            if kind == _TEXT:
+                result.append(value)
+            elif kind == _RANGE:
+                result.append(self._range(value))
+            elif value == 'link_first':
+                if self.page>self.first_page:
+                    result.append(self._pagerlink(self.first_page,
+                        symbol_first))
+            elif value == 'link_last':
+                if self.item_count is not None and self.page<self.last_page:
+                    result.append(self._pagerlink(self.last_page,
+                        symbol_last))
+            elif value == 'link_previous':
+                if self.previous_page:
+                    result.append(self._pagerlink(self.previous_page,
+                        symbol_previous))
+            elif value == 'link_next':
+                if self.next_page:
+                    result.append(self._pagerlink(self.next_page,
+                        symbol_next))
+            else:
+                result.append('%s' % (getattr(self, value),))
 
-        return literal(result)
+        return literal(''.join(result))
 
     #### Private methods ####
-    def _range(self, regexp_match):
+    def _range(self, radius):
         """
         Return range of linked pages (e.g. '1 2 [3] 4 5 6 7 8').
 
         Arguments:
             
-        regexp_match
-            A "re" (regular expressions) match object containing the
-            radius of linked pages around the current page in
-            regexp_match.group(1) as a string
-
-        This function is supposed to be called as a callable in 
-        re.sub.
+        radius
+            The number of linked pages on either side of the current page,
+            from a '~radius~' token in the format.
         
         """
-        radius = int(regexp_match.group(1))
 
         # Compute the first and last page number within the radius
         # e.g. '1 .. 5 6 [7] 8 9 .. 12'
@@ -800,51 +1647,9 @@ class Page(list):
         text
             Text to be printed in the A-HREF tag
         """
-        # Let the url_for() from webhelpers create a new link and set
-        # the variable called 'page_param'. Example:
-        # You are in '/foo/bar' (controller='foo', action='bar')
-        # and you want to add a parameter 'page'. Then you
-        # call the navigator method with page_param='page' and
-        # the url_for() call will create a link '/foo/bar?page=...'
-        # with the respective page number added.
-        link_params = {}
-        # Use the instance kwargs from Page.__init__ as URL parameters
-        link_params.update(self.kwargs)
-        # Add keyword arguments from pager() to the link as parameters
-        link_params.update(self.pager_kwargs)
-        link_params[self.page_param] = page
-
-        # Get the URL generator
-        if self._url_generator is not None:
-            url_generator = self._url_generator
-        else:
-            try:
-                import pylons
-                url_generator = pylons.url.current
-            except (ImportError, AttributeError):
-                try:
-                    import routes
-                    url_generator = routes.url_for
-                    config = routes.request_config()
-                except (ImportError, AttributeError):
-                    raise NotImplementedError("no URL generator available")
-                else:
-                    # if the Mapper is configured with explicit=True we have to fetch
-                    # the controller and action manually
-                    if config.mapper.explicit:
-                        if hasattr(config, 'mapper_dict'):
-                            for k, v in config.mapper_dict.items():
-                                if k != self.page_param:
-                                    link_params[k] = v
-
-        # Create the URL to load a certain page
-        link_url = url_generator(**link_params)
+        link_url, partial_url = self._page_urls(page)
 
         if self.onclick: # create link with onclick action for AJAX
-            # Create the URL to load the page area part of a certain page (AJAX
-            # updates)
-            link_params[self.partial_param] = 1
-            partial_url = url_generator(**link_params)
             try: # if '%s' is used in the 'onclick' parameter (backwards compatibility)
                 onclick_action = self.onclick % (partial_url,)
             except TypeError:
@@ -852,9 +1657,430 @@ class Page(list):
                   "partial_url": partial_url,
                   "page": page
                 })
-            return HTML.a(text, href=link_url, onclick=onclick_action, **self.link_attr)
+            return HTML.a(text, href=link_url, onclick=onclick_action,
+                _attrs=self._link_attrs)
         else: # return static link
-            return HTML.a(text, href=link_url, **self.link_attr)
+            return HTML.a(text, href=link_url, _attrs=self._link_attrs)
+
+    def _page_urls(self, page):
+        """Return the URL of a page, and the URL for a partial update if
+        'onclick' is set (else None).
+
+        Calling the URL generator for every link is slow, especially with
+        Routes, so it's called once with a placeholder page number to make
+        a template for each URL, and the page numbers are substituted into
+        the templates.  The templates are used only if they produce the
+        same URLs as the URL generator does for page 1 (which generators
+        often special-case), page 2, and the first link's page; otherwise
+        the generator is called for every link.
+        """
+        templates = self._url_templates
+        if templates is None:
+            templates = self._url_templates = self._make_url_templates(page)
+        if not templates:
+            return self._generate_page_urls(page)
+        return self._fill_url_templates(templates, page)
+
+    def _generate_page_urls(self, page):
+        """Call the URL generator for ``_page_urls()``."""
+        if self._link_params is None:
+            # Let the url_for() from webhelpers create a new link and set
+            # the variable called 'page_param'. Example:
+            # You are in '/foo/bar' (controller='foo', action='bar')
+            # and you want to add a parameter 'page'. Then you
+            # call the navigator method with page_param='page' and
+            # the url_for() call will create a link '/foo/bar?page=...'
+            # with the respective page number added.
+            link_params = {}
+            # Use the instance kwargs from Page.__init__ as URL parameters
+            link_params.update(self.kwargs)
+            # Add keyword arguments from pager() to the link as parameters
+            link_params.update(self.pager_kwargs)
+            self._link_generator = self._get_url_generator(link_params,
+                [self.page_param])
+            self._link_params = link_params
+        link_params = self._link_params.copy()
+        link_params[self.page_param] = page
+
+        # Create the URL to load a certain page
+        link_url = self._link_generator(**link_params)
+
+        partial_url = None
+        if self.onclick:
+            # Create the URL to load the page area part of a certain page (AJAX
+            # updates)
+            link_params[self.partial_param] = 1
+            partial_url = self._link_generator(**link_params)
+        return link_url, partial_url
+
+    def _make_url_templates(self, page):
+        """Return URL templates for ``_page_urls()``, or False if the URL
+        generator can't be templated.
+
+        ``page`` is the page number of the first link.  The templates are
+        checked against the generated URLs of pages 1, 2, and ``page``.
+        """
+        try:
+            templates = self._generate_page_urls(_PAGE_PLACEHOLDER)
+        except Exception:
+            # The generator can't handle a placeholder; e.g., it requires an
+            # int or the route requires digits.
+            return False
+        for url in templates:
+            if url is not None and url.count(_PAGE_PLACEHOLDER) != 1:
+                return False
+        checks = [1, 2]
+        if page not in checks:
+            checks.append(page)
+        for check in checks:
+            if self._fill_url_templates(templates, check) != \
+                self._generate_page_urls(check):
+                return False
+        return templates
+
+    def _fill_url_templates(self, templates, page):
+        """Substitute a page number into the URL templates."""
+        page = str(page)
+        link_url, partial_url = templates
+        link_url = link_url.replace(_PAGE_PLACEHOLDER, page)
+        if partial_url is not None:
+            partial_url = partial_url.replace(_PAGE_PLACEHOLDER, page)
+        return link_url, partial_url
+
+    def _get_url_generator(self, link_params, own_params):
+        """Return the URL generator to use for pager links.
+
+        This is the ``url`` argument to the constructor, or else Pylons' or
+        Routes' URL generator.  In the latter case, if the Routes mapper is
+        explicit, add the current route variables to ``link_params`` except
+        those named in ``own_params``.
+        """
+        if self._url_generator is not None:
+            return self._url_generator
+        try:
+            import pylons
+            return pylons.url.current
+        except (ImportError, AttributeError):
+            try:
+                import routes
+                url_generator = routes.url_for
+                config = routes.request_config()
+            except (ImportError, AttributeError):
+                raise NotImplementedError("no URL generator available")
+            else:
+                # if the Mapper is configured with explicit=True we have to fetch
+                # the controller and action manually
+                if config.mapper.explicit:
+                    if hasattr(config, 'mapper_dict'):
+                        for k, v in config.mapper_dict.items():
+                            if k not in own_params:
+                                link_params[k] = v
+                return url_generator
+
+
+class PageInfo(object):
+    """A compact record of a page: its items and numbers.
+
+    A ``Page`` is a list of its items, but also keeps a second list of them
+    in ``.items``, the collection, and the pager settings.  To keep pages
+    in a cache, especially one in another process, store a ``PageInfo``
+    instead.  It has only the attributes below, in slots, and its items
+    are the page's ``.items`` list, not a copy.  It pickles to just those
+    values.
+
+    Create one with ``Page.info()``.  Iterating it, indexing it, and
+    ``len()`` apply to the items.  To render the pager, make a ``Page`` from
+    it with ``.to_page()``; the collection isn't needed.
+
+    Attributes: items, page, items_per_page, item_count, first_page,
+    last_page, page_count, first_item, last_item, previous_page, next_page;
+    as in ``Page``.
+    """
+    __slots__ = ("items", "page", "items_per_page", "item_count",
+        "first_page", "last_page", "page_count", "first_item", "last_item",
+        "previous_page", "next_page")
+
+    def __init__(self, page):
+        for name in self.__slots__:
+            setattr(self, name, getattr(page, name))
+
+    def __getstate__(self):
+        return tuple([getattr(self, name) for name in self.__slots__])
+
+    def __setstate__(self, state):
+        for name, value in zip(self.__slots__, state):
+            setattr(self, name, value)
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def __len__(self):
+        return len(self.items)
+
+    def __getitem__(self, index):
+        return self.items[index]
+
+    def __repr__(self):
+        return "<PageInfo page %s of %s, items %s-%s of %s>" % (self.page,
+            self.page_count, self.first_item, self.last_item,
+            self.item_count)
+
+    def to_page(self, url=None, **kwargs):
+        """Return a ``Page`` with these items and numbers.
+
+        ``url`` and keyword arguments are as for the ``Page`` constructor;
+        they're used by the pager.
+        """
+        page = Page.__new__(Page)
+        list.__init__(page, self.items)
+        for name in self.__slots__:
+            setattr(page, name, getattr(self, name))
+        page._url_generator = url
+        page.kwargs = kwargs
+        page.original_collection = page.collection = self.items
+        return page
+
+
+class KeysetPage(Page):
+    """A page of a collection located by key rather than by page number.
+
+    ``Page`` fetches page N with ``OFFSET (N-1)*items_per_page``, which makes
+    the database read and discard all the preceding rows, and it counts the
+    whole collection.  A keyset page (also called "seek" pagination) instead
+    remembers the sort key of the last item shown, and asks for the items
+    after it::
+
+        SELECT ... WHERE key > :after ORDER BY key LIMIT :items_per_page
+
+    With an index on the key, this costs the same on the last page as on the
+    first, and nothing is counted.  The tradeoff is that there are no page
+    numbers: you can only go to the next or previous page.  The key must be
+    unique, or items with equal keys could be skipped.
+
+    ``collection`` may be an SQLAlchemy query, an SQLAlchemy select (which
+    requires ``sqlalchemy_session``), or a sequence already sorted by the key.
+    It's sorted by the key in ascending order; don't order it yourself.
+
+    ``key`` is the column to page by, e.g. ``MyModel.id`` or
+    ``my_table.c.id``.  For a sequence, it's a function that returns an
+    item's key.
+
+    ``after`` is the key of the last item on the previous page, or None to
+    start at the beginning.  ``before`` is the key of the first item on the
+    next page; use it to go backward.  Normally these come from query
+    parameters set by the links ``.pager()`` makes, so convert them to the
+    key's type first: ``KeysetPage(q, MyModel.id,
+    after=int(request.GET["after"]))``.
+
+    ``key_getter`` is a function that returns an item's key, to compute the
+    cursors.  For a sequence, the default is ``key``.  For SQLAlchemy, the
+    default gets the attribute named like the key column, which works for
+    ORM objects and result rows.
+
+    ``url`` and other keyword arguments are as for ``Page``.
+
+    Instance attributes:
+
+    items
+        The items on this page, in key order
+
+    next_cursor
+        The key to pass as ``after`` for the next page, or None if this is
+        the last page
+
+    previous_cursor
+        The key to pass as ``before`` for the previous page, or None if this
+        is the first page
+
+    items_per_page, key, after, before
+        As passed to the constructor
+
+    The page number and count attributes of ``Page`` are None.
+    """
+    def __init__(self, collection, key, after=None, before=None,
+        items_per_page=20, sqlalchemy_session=None, key_getter=None,
+        url=None, **kwargs):
+        self._url_generator = url
+        self.kwargs = kwargs
+        self.original_collection = collection
+        self.collection = get_wrapper(collection, sqlalchemy_session)
+        self.key = key
+        self.after = after
+        self.before = before
+        self.items_per_page = items_per_page
+        if key_getter is None:
+            if hasattr(self.collection, "seek"):
+                key_getter = operator.attrgetter(key.key)
+            else:
+                key_getter = key
+        self.key_getter = key_getter
+
+        # Fetch one extra item to find out whether there's a page beyond this
+        # one in the direction we're going.
+        items = _seek(self.collection, key, after, before, items_per_page + 1)
+        more = len(items) > items_per_page
+        self.next_cursor = self.previous_cursor = None
+        if before is not None:
+            if more:
+                items = items[-items_per_page:]
+                self.previous_cursor = key_getter(items[0])
+            if items:
+                self.next_cursor = key_getter(items[-1])
+        else:
+            if more:
+                items = items[:items_per_page]
+                self.next_cursor = key_getter(items[-1])
+            if after is not None and items:
+                # Link to the previous page only if there is one; ``after``
+                # may be before the first item.
+                first = key_getter(items[0])
+                if _seek(self.collection, key, None, first, 1):
+                    self.previous_cursor = first
+        self.items = items
+
+        self.page = self.item_count = self.page_count = None
+        self.first_page = self.last_page = None
+        self.first_item = self.last_item = None
+        self.previous_page = self.next_page = None
+        list.__init__(self, self.items)
+
+    def __repr__(self):
+        return ("KeysetPage:\n"
+            "Collection type:  %(type)s\n"
+            "After:            %(after)r\n"
+            "Before:           %(before)r\n"
+            "Previous cursor:  %(previous_cursor)r\n"
+            "Next cursor:      %(next_cursor)r\n"
+            "Items per page:   %(items_per_page)s\n"
+            % {
+            'type':type(self.collection),
+            'after':self.after,
+            'before':self.before,
+            'previous_cursor':self.previous_cursor,
+            'next_cursor':self.next_cursor,
+            'items_per_page':self.items_per_page,
+            })
+
+    def pager(self, format='$link_previous $link_next', after_param='after',
+        before_param='before', show_if_single_page=False,
+        symbol_previous='<', symbol_next='>',
+        link_attr={'class':'pager_link'}, **kwargs):
+        """Return links to the previous and next pages.
+
+        format:
+            Format string with these $-tokens:
+
+            - $link_previous: link to previous page (unless this is the
+              first page)
+            - $link_next: link to next page (unless this is the last page)
+            - $items_per_page: maximal number of items per page
+
+            Default: '$link_previous $link_next'
+
+        after_param, before_param:
+            The names of the URL parameters carrying the cursors.  The URL
+            generator is called with both, and the one not in use is None;
+            ``PageURL`` and ``PageURL_WebOb`` remove parameters that are
+            None from the query string.
+
+            Default: 'after' and 'before'
+
+        ``show_if_single_page``, ``symbol_previous``, ``symbol_next``, and
+        ``link_attr`` are as for ``Page.pager()``.  Additional keyword
+        arguments are used as arguments in the links.
+        """
+        self.pager_kwargs = kwargs
+        self.after_param = after_param
+        self.before_param = before_param
+        self.link_attr = link_attr
+        self._link_attrs = FrozenAttrs(**link_attr)
+
+        if self.previous_cursor is None and self.next_cursor is None \
+            and not show_if_single_page:
+            return ''
+
+        link_previous = link_next = ''
+        if self.previous_cursor is not None:
+            link_previous = self._cursorlink(before_param,
+                self.previous_cursor, symbol_previous)
+        if self.next_cursor is not None:
+            link_next = self._cursorlink(after_param, self.next_cursor,
+                symbol_next)
+        result = Template(format).safe_substitute({
+            'items_per_page': self.items_per_page,
+            'link_previous': link_previous,
+            'link_next': link_next,
+        })
+        return literal(result)
+
+    def _cursorlink(self, param, cursor, text):
+        """Return a link to the page on one side of ``cursor``.
+
+        ``param`` is ``after_param`` or ``before_param``.
+        """
+        link_params = {}
+        link_params.update(self.kwargs)
+        link_params.update(self.pager_kwargs)
+        link_params[self.after_param] = None
+        link_params[self.before_param] = None
+        link_params[param] = cursor
+        url_generator = self._get_url_generator(link_params,
+            [self.after_param, self.before_param])
+        return HTML.a(text, href=url_generator(**link_params),
+            _attrs=self._link_attrs)
+
+
+#### PAGER FORMATS
+# Segment kinds in a compiled format.
+_TEXT, _RANGE, _VARIABLE = range(3)
+
+_FORMAT_VARIABLES = frozenset(['first_page', 'last_page', 'page',
+    'page_count', 'items_per_page', 'first_item', 'last_item', 'item_count',
+    'link_first', 'link_last', 'link_previous', 'link_next'])
+
+_range_rx = re.compile(r'~(\d+)~')
+
+_compiled_formats = LRUCache(128)
+
+def _compile_format(format):
+    """Compile a ``Page.pager()`` format to a list of segments.
+
+    Each segment is a tuple ``(_TEXT, text)``, ``(_RANGE, radius)``, or
+    ``(_VARIABLE, name)``.  $-variables follow the rules of
+    ``string.Template.safe_substitute()``: '$$' is a '$', and unknown
+    variables are left as they are.  The result is cached.
+    """
+    segments = _compiled_formats.get(format)
+    if segments is not None:
+        return segments
+    segments = []
+    def add_text(text):
+        if not text:
+            return
+        if segments and segments[-1][0] == _TEXT:
+            segments[-1] = (_TEXT, segments[-1][1] + text)
+        else:
+            segments.append((_TEXT, text))
+    parts = _range_rx.split(format)
+    for i, part in enumerate(parts):
+        if i % 2:
+            segments.append((_RANGE, int(part)))
+            continue
+        pos = 0
+        for m in Template.pattern.finditer(part):
+            add_text(part[pos:m.start()])
+            pos = m.end()
+            name = m.group('named') or m.group('braced')
+            if name in _FORMAT_VARIABLES:
+                segments.append((_VARIABLE, name))
+            elif m.group('escaped') is not None:
+                add_text(Template.delimiter)
+            else:
+                add_text(m.group())
+        add_text(part[pos:])
+    segments = tuple(segments)
+    _compiled_formats[format] = segments
+    return segments
 
 
 #### URL GENERATOR CLASSES
@@ -868,7 +2094,8 @@ def make_page_url(path, params, page, partial=False, sort=True):
 
     ``params`` is the current query parameters as a dict or dict-like object.
 
-    ``page`` is the target page number.
+    ``page`` is the target page number.  If None, the 'page' parameter is
+    left as it is.
 
     If ``partial`` is true, set query param 'partial=1'. This is to for AJAX
     calls requesting a partial page.
@@ -877,7 +2104,8 @@ def make_page_url(path, params, page, partial=False, sort=True):
     they'll be in whatever order the dict iterates them.
     """
     params = params.copy()
-    params["page"] = page
+    if page is not None:
+        params["page"] = page
     if partial:
         params["partial"] = "1"
     if sort:
@@ -900,9 +2128,14 @@ class PageURL(object):
         self.path = path
         self.params = params
 
-    def __call__(self, page, partial=False):
-        """Generate a URL for the specified page."""
-        return make_page_url(self.path, self.params, page, partial)
+    def __call__(self, page=None, partial=False, **params):
+        """Generate a URL for the specified page.
+
+        Keyword arguments override other query parameters, or remove them if
+        None.  ``KeysetPage.pager()`` uses this for its cursors.
+        """
+        return make_page_url(self.path, _override_params(self.params, params),
+            page, partial)
 
 
 class PageURL_WebOb(object):
@@ -929,10 +2162,32 @@ class PageURL_WebOb(object):
         self.request = request
         self.qualified = qualified
 
-    def __call__(self, page, partial=False):
-        """Generate a URL for the specified page."""
+    def __call__(self, page=None, partial=False, **params):
+        """Generate a URL for the specified page.
+
+        Keyword arguments override other query parameters, or remove them if
+        None.  ``KeysetPage.pager()`` uses this for its cursors.
+        """
         if self.qualified:
             path = self.request.application_url
         else:
             path = self.request.path
-        return make_page_url(path, self.request.GET, page, partial)
+        return make_page_url(path, _override_params(self.request.GET, params),
+            page, partial)
+
+def _override_params(params, overrides):
+    """Return a copy of query parameters ``params`` updated with
+    ``overrides``, removing those whose value is None.
+
+    Return ``params`` itself if there's nothing to override.
+    """
+    if not overrides:
+        return params
+    params = params.copy()
+    for k, v in overrides.items():
+        if v is None:
+            params.pop(k, None)
+        else:
+            params[k] = v
+    return params
+
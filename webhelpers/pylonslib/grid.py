@@ -7,6 +7,7 @@ PYRAMID USERS: This implementation is incompatible with Pyramid. Use
 ``webhelpers.html.grid`` instead.
 """
 
+import operator
 
 from webhelpers.html.builder import HTML, literal
 import webhelpers.html.grid as grid
@@ -35,17 +36,15 @@ class PylonsGrid(grid.Grid):
         """ 
         from pylons import url
         # this will handle possible URL generation
-        request_copy = dict(self.request.copy().GET) 
-        self.order_column = request_copy.pop("order_col", None)
-        self.order_dir = request_copy.pop("order_dir", None)
+        request_copy = self._request_params()
         
         if column == self.order_column and self.order_dir == "asc":
             new_order_dir = "dsc"
         else:
             new_order_dir = "asc"
         
-        url_href = url.current(order_col=column, order_dir=new_order_dir,
-                               **request_copy)
+        url_href = self.header_url(column, new_order_dir, url.current,
+                                   request_copy)
         label_text = HTML.tag("a", href=url_href, c=label_text)
         # Is the current column the one we're ordering on?
         if column == self.order_column:
@@ -56,8 +55,24 @@ class PylonsGrid(grid.Grid):
             return self.default_header_column_format(column_number, column,
                                                      label_text)
 
+    def _request_params(self):
+        """ sets the order column and direction from the request, and returns
+        the other query parameters. The request is read once. """
+        cache = getattr(self, "_request_cache", None)
+        if cache is None or cache[0] is not self.request:
+            request_copy = dict(self.request.copy().GET) 
+            order = (request_copy.pop("order_col", None),
+                     request_copy.pop("order_dir", None))
+            cache = self._request_cache = (self.request, order, request_copy)
+        self.order_column, self.order_dir = cache[1]
+        return cache[2]
+    
+    def __getstate__(self):
+        state = super(PylonsGrid, self).__getstate__()
+        state.pop("_request_cache", None)
+        return state
+
 class PylonsObjectGrid(PylonsGrid):
     """ This grid will work well with sqlalchemy row instances """
-    def default_column_format(self, column_number, i, record, column_name):
-        class_name = "c%s" % (column_number)
-        return HTML.tag("td", getattr(record, column_name), class_=class_name)
+    def column_getter(self, column_name):
+        return operator.attrgetter(column_name)
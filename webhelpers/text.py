@@ -4,6 +4,7 @@
 Helpers for filtering, formatting, and transforming strings.
 """
 
+import itertools
 import re
 import textwrap
 import urllib
@@ -28,9 +29,11 @@ __all__ = [
     "remove_formatting",
     "replace_whitespace",
     "series",
+    "SlugGenerator",
     "strip_leading_whitespace",
     "truncate", 
     "urlify",
+    "urlify_many",
     "wrap_paragraphs",
     ]
 
@@ -272,12 +275,110 @@ def urlify(string):
     Changed in WebHelpers 1.2: urlecode the result in case it contains special
     characters like "?". 
     """
-    s = remove_formatting(string).lower()
-    s = replace_whitespace(s, '-')
-    s = collapse(s, '-')
+    return _urlify(string)
+
+def _urlify(string):
+    """Do the work of ``urlify()`` and ``urlify_many()``.
+
+    This is ``remove_formatting()``, ``replace_whitespace()`` and
+    ``collapse()`` inlined.
+    """
+    s = strip_tags(string)
+    s = _accented_entity_rx.sub(r'\1', s)
+    s = _other_entity_rx.sub('', _misc_entity_rx.sub(_misc_entity_repl, s))
+    if unidecode:
+        s = unidecode(s)
+    s = _collapse_regexes[" "].sub(" ", s.strip(" ")).lower()
+    s = _whitespace_rx.sub('-', s)
+    s = _collapse_regexes["-"].sub("-", s.strip("-"))
     return urllib.quote(s)
 
 
+def urlify_many(strings):
+    """Iterate the ``urlify()`` result for each string in an iterable.
+
+    The iterable is consumed lazily, so it can be very large.
+
+        >>> list(urlify_many(["Mighty Mighty Bosstones", "Fish &amp; Chips"]))
+        ['mighty-mighty-bosstones', 'fish-and-chips']
+    """
+    for s in strings:
+        yield _urlify(s)
+
+
+class SlugGenerator(object):
+    """Generate unique URL slugs for a series of titles.
+
+    Each title is converted with ``urlify()``.  If the result has already
+    been issued, "-2", "-3", etc. is appended to make it unique.  The slugs
+    issued so far are kept in a set, so each check takes constant time.
+
+        >>> slugs = SlugGenerator(existing=["about"])
+        >>> list(slugs(["About", "News", "news", "News 2"]))
+        ['about-2', 'news', 'news-2', 'news-2-2']
+        >>> slugs.slug("About")
+        'about-3'
+
+    ``existing`` is an iterable of slugs already in use (e.g., from the
+    database).
+
+    Calling the instance with an iterable of titles returns an iterator of
+    slugs in the same order; the titles are consumed lazily.  If
+    ``processes`` is given, the titles are urlified in a
+    ``multiprocessing.Pool`` with that many processes, ``chunksize`` titles
+    at a time.  The titles are then read ``processes * chunksize`` at a
+    time, so memory use stays bounded.  That's worthwhile only for very
+    large inputs.  Uniqueness is always resolved in the calling process.
+    """
+
+    def __init__(self, existing=(), processes=None, chunksize=1000):
+        self.issued = set(existing)
+        self.processes = processes
+        self.chunksize = chunksize
+        # Base slug => next suffix to try.
+        self._counters = {}
+
+    def slug(self, string):
+        """Return a unique slug for one title."""
+        return self._unique(urlify(string))
+
+    def __call__(self, strings):
+        if not self.processes:
+            for s in urlify_many(strings):
+                yield self._unique(s)
+            return
+        import multiprocessing
+        pool = multiprocessing.Pool(self.processes)
+        strings = iter(strings)
+        # Pool.imap() would read all the titles at once, so feed it batches.
+        batchsize = self.processes * self.chunksize
+        try:
+            while True:
+                batch = list(itertools.islice(strings, batchsize))
+                if not batch:
+                    break
+                for s in pool.imap(urlify, batch, self.chunksize):
+                    yield self._unique(s)
+        finally:
+            pool.terminate()
+            pool.join()
+
+    def _unique(self, base):
+        """Return ``base`` or a suffixed form of it that hasn't been issued.
+        """
+        issued = self.issued
+        slug = base
+        if slug in issued:
+            n = self._counters.get(base, 2)
+            slug = "%s-%d" % (base, n)
+            while slug in issued:
+                n += 1
+                slug = "%s-%d" % (base, n)
+            self._counters[base] = n + 1
+        issued.add(slug)
+        return slug
+
+
 def remove_formatting(string):
     """Simplify HTML text by removing tags and several kinds of formatting.
     
@@ -321,8 +422,10 @@ def convert_accented_entities(string):
     Based on Ruby's stringex package
     (http://github.com/rsl/stringex/tree/master)
     """
-    return re.sub(r'\&([A-Za-z])(grave|acute|circ|tilde|uml|ring|cedil|slash);',
-                  r'\1', string)
+    return _accented_entity_rx.sub(r'\1', string)
+
+_accented_entity_rx = re.compile(
+    r'\&([A-Za-z])(grave|acute|circ|tilde|uml|ring|cedil|slash);')
 
 
 def convert_misc_entities(string):
@@ -335,30 +438,52 @@ def convert_misc_entities(string):
     Based on Ruby's stringex package
     (http://github.com/rsl/stringex/tree/master)
     """
-    replace_dict = {
-        "#822[01]": "\"",
-        "#821[67]": "'",
-        "#8230": "...",
-        "#8211": "-",
-        "#8212": "--",
-        "#215": "x",
-        "gt": ">",
-        "lt": "<",
-        "(#8482|trade)": "(tm)",
-        "(#174|reg)": "(r)",
-        "(#169|copy)": "(c)",
-        "(#38|amp)": "and",
-        "nbsp": " ",
-        "(#162|cent)": " cent",
-        "(#163|pound)": " pound",
-        "(#188|frac14)": "one fourth",
-        "(#189|frac12)": "half",
-        "(#190|frac34)": "three fourths",
-        "(#176|deg)": " degrees"
+    string = _misc_entity_rx.sub(_misc_entity_repl, string)
+    return _other_entity_rx.sub('', string)
+
+# Entity name => replacement text.
+_misc_entities = {
+    "#8220": "\"",
+    "#8221": "\"",
+    "#8216": "'",
+    "#8217": "'",
+    "#8230": "...",
+    "#8211": "-",
+    "#8212": "--",
+    "#215": "x",
+    "gt": ">",
+    "lt": "<",
+    "#8482": "(tm)",
+    "trade": "(tm)",
+    "#174": "(r)",
+    "reg": "(r)",
+    "#169": "(c)",
+    "copy": "(c)",
+    "#38": "and",
+    "amp": "and",
+    "nbsp": " ",
+    "#162": " cent",
+    "cent": " cent",
+    "#163": " pound",
+    "pound": " pound",
+    "#188": "one fourth",
+    "frac14": "one fourth",
+    "#189": "half",
+    "frac12": "half",
+    "#190": "three fourths",
+    "frac34": "three fourths",
+    "#176": " degrees",
+    "deg": " degrees",
     }
-    for textiled, normal in replace_dict.items():
-        string = re.sub(r'\&%s;' % textiled, normal, string)
-    return re.sub(r'\&[^;]+;', '', string)
+
+_misc_entity_rx = re.compile(r'\&(%s);' % "|".join(_misc_entities))
+
+def _misc_entity_repl(m):
+    return _misc_entities[m.group(1)]
+
+# Any entities remaining after the above are removed.  This must be a second
+# pass; otherwise an unknown entity could swallow a known one after it.
+_other_entity_rx = re.compile(r'\&[^;]+;')
 
 
 '''*** DISABLED convert_misc_characters: fails doc tests.
@@ -439,8 +564,10 @@ def replace_whitespace(string, replace=" "):
     Based on Ruby's stringex package
     (http://github.com/rsl/stringex/tree/master)
     """
-    return re.sub(r'\s+', replace, string)
- 
+    return _whitespace_rx.sub(replace, string)
+
+_whitespace_rx = re.compile(r'\s+')
+
 def collapse(string, character=" "):
     """Removes specified character from the beginning and/or end of the
     string and then condenses runs of the character within the string.
@@ -448,5 +575,19 @@ def collapse(string, character=" "):
     Based on Ruby's stringex package
     (http://github.com/rsl/stringex/tree/master)
     """
-    reg = re.compile('(%s){2,}' % character)
-    return re.sub(reg, character, string.strip(character))
+    reg = _collapse_rx(character)
+    return reg.sub(character, string.strip(character))
+
+def _collapse_rx(character):
+    """Return the compiled regex for ``collapse()``."""
+    try:
+        return _collapse_regexes[character]
+    except KeyError:
+        # Not escaped, for backward compatibility.
+        return re.compile('(%s){2,}' % character)
+
+# Only the characters ``urlify()`` uses are kept, so the cache can't grow.
+_collapse_regexes = {
+    " ": re.compile('( ){2,}'),
+    "-": re.compile('(-){2,}'),
+    }